@@ -1,45 +1,265 @@
 import json
+import os
 import pprint
+import argparse
+import re
+import hashlib
+import time
+import bank
+import journal
+import neardup
 
-def parse_questions(file_path="Questions.txt"):
-    """Parse questions and answers from a text file where answers are indented.
-       Supports multiple correct answers (prefixed with '>')."""
-    QuestionsAnswers = {}
-    
-    with open(file_path, "r", encoding="utf-8") as f:
-        lines = [line.rstrip() for line in f if line.strip()]  # keep indentation, drop blanks
 
-    question = None
+def iter_blocks(file_path="Questions.txt", problems=None):
+    """Stream (block, line_no) for each question block: the raw bytes of the question line and
+       its indented answer lines, newlines normalized to \\n. line_no is the line of the question.
+       An unindented, non-blank line starts a block. The file is read a line at a time, so
+       memory stays flat however large it is. Problems found while reading are appended to
+       problems as (line_no, message)."""
+    block, line_no = [], 0
+    # universal newlines normalize \r\n and \r; surrogateescape gives back the exact bytes
+    with open(file_path, "r", encoding="utf-8", errors="surrogateescape", newline=None) as f:
+        for n, line in enumerate(f, 1):
+            if line[0] not in " \t\n":
+                if block:
+                    yield "".join(block).encode("utf-8", "surrogateescape"), line_no
+                block, line_no = [line], n
+            elif block:
+                block.append(line)
+            elif problems is not None and line.strip():
+                problems.append((n, "answer before the first question, ignored"))
+    if block:
+        yield "".join(block).encode("utf-8", "surrogateescape"), line_no
+
+
+def parse_block(block):
+    """Split a block into (question, correct, wrong). Supports multiple correct answers (prefixed with '>')."""
+    lines = block.decode("utf-8").split("\n")
     correct = []
     wrong = []
+    for line in lines[1:]:
+        answer = line.strip()
+        if not answer:
+            continue  # drop blanks
+        if answer.startswith(">"):
+            correct.append(answer[1:].strip())  # remove ">"
+        else:
+            wrong.append(answer)
+    return lines[0].strip(), correct, wrong
+
+
+def iter_questions(file_path="Questions.txt", problems=None):
+    """Stream (question, correct, wrong, line_no) records from a text file where answers are indented.
+       Supports multiple correct answers (prefixed with '>'). line_no is the line of the question.
+       Problems found while reading are appended to problems as (line_no, message)."""
+    for block, line_no in iter_blocks(file_path, problems):
+        yield parse_block(block) + (line_no,)
+
+
+def validate(records, problems):
+    """Pass (question, correct, wrong, line_no, ...) records through, reporting questions with
+       no correct answer and dropping repeats of a question already seen (the first one wins)."""
+    first_seen = {}  # digest of question text -> line, so memory is a few bytes per question
+    for record in records:
+        question, correct, wrong, line_no = record[:4]
+        digest = hashlib.blake2b(question.encode("utf-8"), digest_size=8).digest()
+        if digest in first_seen:
+            problems.append((line_no, f"duplicate of the question on line {first_seen[digest]}, skipped"))
+            continue
+        first_seen[digest] = line_no
+        if not correct:
+            problems.append((line_no, "no correct answer (no '>' line)"))
+        if not correct and not wrong:
+            problems.append((line_no, "question has no answers"))
+        yield record
+
+
+def parse_questions(file_path="Questions.txt", problems=None):
+    """Parse questions and answers from a text file where answers are indented.
+       Supports multiple correct answers (prefixed with '>')."""
+    problems = [] if problems is None else problems
+    return {question: {"correct": correct, "wrong": wrong}
+            for question, correct, wrong, _ in validate(iter_questions(file_path, problems), problems)}
+
+
+def write_json_stream(items, file_path="Questions.json"):
+    """Write (question, entry) pairs as the same indented JSON object save_to_json produces,
+       one question at a time. Returns the number of questions written."""
+    count = 0
+    tmp = file_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as json_file:
+        json_file.write("{")
+        for question, entry in items:
+            value = json.dumps(entry, indent=4, ensure_ascii=False)
+            json_file.write(("," if count else "") + "\n    " + json.dumps(question, ensure_ascii=False)
+                            + ": " + value.replace("\n", "\n    "))
+            count += 1
+        json_file.write("\n}" if count else "}")
+    os.replace(tmp, file_path)
+    return count
+
+
+def write_jsonl(records, file_path="Questions.jsonl"):
+    """Write one JSON object per question. Returns the number of questions written."""
+    count = 0
+    tmp = file_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as jsonl_file:
+        for question, correct, wrong, line_no in records:
+            jsonl_file.write(json.dumps({"question": question, "correct": correct, "wrong": wrong, "line": line_no},
+                                        ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(tmp, file_path)
+    return count
+
+
+# ----------------------------
+# Incremental builds
+# ----------------------------
+# Each build records a fingerprint (content hash) of every question block in
+# <bank>.build.json. The next build only parses blocks whose fingerprint is new,
+# takes the rest from the current bank, and carries stats and review schedules
+# over to unchanged questions and to questions whose text was only trivially
+# edited (renumbered, recased, punctuation or spacing).
+
+def fingerprint(block):
+    return hashlib.blake2b(block, digest_size=16).hexdigest()
+
+
+def normalize(question):
+    """Question text with numbering, case, punctuation and spacing taken out."""
+    text = re.sub(r"^\s*\d+\s*[.)]\s*", "", question.casefold())
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def load_previous(json_path="Questions.json", bank_path="Questions.bank", journal_path="Questions.journal"):
+    """The bank the quiz would load right now, answers still waiting in the journal included, or {}."""
+    if bank.is_current(bank_path, json_path):
+        previous = bank.CompiledBank(bank_path, private=True)
+    elif os.path.exists(json_path):
+        previous = load_from_json(json_path)
+    else:
+        return {}
+    journal.Journal(journal_path).replay(previous)
+    return previous
 
-    for line in lines:
-        if line.startswith(" ") or line.startswith("\t"):  # indented = answer
-            answer = line.strip()
-            if answer.startswith(">"):
-                correct.append(answer[1:].strip())  # remove ">"
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path, source):
+    """The last build of source: {"digest", "count", "blocks": [[fingerprint, question], ...]}, or {}."""
+    try:
+        manifest = load_from_json(manifest_path)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("source") == os.path.abspath(source) else {}
+
+
+def save_manifest(manifest_path, source, digest, count, blocks):
+    journal.atomic_write_json({"source": os.path.abspath(source), "digest": digest, "count": count, "blocks": blocks},
+                              manifest_path, ensure_ascii=False)
+
+
+def renamed_questions(source, previous):
+    """{normalized text: question} for the questions of previous that are gone from source,
+       or {} if source has no new question for them to have been renamed to."""
+    missing = set(previous)
+    new = False
+    for block, _ in iter_blocks(source):
+        question = block.split(b"\n", 1)[0].decode("utf-8").strip()  # parse_block's question
+        if question in missing:
+            missing.discard(question)
+        elif question not in previous:
+            new = True
+    return {normalize(q): q for q in missing} if new else {}
+
+
+def build(source, previous, known, problems, blocks, counts):
+    """Stream (question, entry, line_no) for source, taking blocks whose fingerprint is listed
+       in known from previous instead of parsing them, and carrying stats over from previous.
+       Every block's [fingerprint, question] is appended to blocks for the next build, and
+       counts gets how many were reused, parsed, carried and renamed."""
+    known = dict(known)
+    counts.update(reused=0, parsed=0, carried=0, renamed=0)
+    # Questions that are new and old ones that are gone are matched up by normalized text;
+    # finding the gone ones takes a quick first pass over the question lines
+    renamed = renamed_questions(source, previous) if previous else {}
+
+    def records():
+        for block, line_no in iter_blocks(source, problems):
+            fp = fingerprint(block)
+            question = known.get(fp)
+            old = previous.get(question) if question is not None else None
+            if old is not None:
+                counts["reused"] += 1
+                record = question, old["correct"], old["wrong"], line_no, old
             else:
-                wrong.append(answer)
-        else:
-            # save previous question if any
-            if question is not None:
-                QuestionsAnswers[question] = {
-                    "correct": correct,
-                    "wrong": wrong
-                }
-            # start new question
-            question = line.strip()
-            correct = []
-            wrong = []
-
-    # save last one
-    if question is not None:
-        QuestionsAnswers[question] = {
-            "correct": correct,
-            "wrong": wrong
-        }
-
-    return QuestionsAnswers
+                counts["parsed"] += 1
+                record = parse_block(block) + (line_no, None)
+            blocks.append([fp, record[0]])  # duplicates too, so they are recognised next time
+            yield record
+
+    for question, correct, wrong, line_no, old in validate(records(), problems):
+        if old is None:
+            old = previous.get(question)
+        if old is None and renamed:
+            old_question = renamed.pop(normalize(question), None)
+            if old_question is not None:
+                old = previous[old_question]
+                counts["renamed"] += 1
+        entry = {"correct": correct, "wrong": wrong}
+        if old is not None:
+            for key in journal.FIELDS:
+                if key in old:
+                    entry[key] = dict(old[key])
+            counts["carried"] += 1
+        yield question, entry, line_no
+
+
+class SourceWatcher:
+    """Follows a Questions.txt-style file for a running quiz. poll(data) rebuilds it with
+       build() when it changed, so only new or edited blocks are parsed, and returns the
+       difference from data: {"items", "added", "removed", "edited", "counts", "problems"},
+       where added and edited map questions to their new entries."""
+    SETTLE = 0.5  # seconds a file has to be left alone before it is read, so half-saved files are skipped
+
+    def __init__(self, source="Questions.txt", manifest_path="Questions.build.json"):
+        self.source = source
+        self.manifest_path = manifest_path
+        self.blocks = load_manifest(manifest_path, source).get("blocks", [])
+        self.seen = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.source)
+        except OSError:
+            return None
+        return st.st_mtime, st.st_size
+
+    def poll(self, data):
+        seen = self._stat()
+        if seen is None or seen == self.seen or time.time() - seen[0] < self.SETTLE:
+            return None
+        self.seen = seen
+        problems, blocks, counts = [], [], {}
+        items = [(question, entry) for question, entry, _ in build(self.source, data, self.blocks, problems, blocks, counts)]
+        self.blocks = blocks
+        save_manifest(self.manifest_path, self.source, file_digest(self.source), len(items), self.blocks)
+        present = {question for question, _ in items}
+        change = {"items": items, "added": {}, "removed": [q for q in data if q not in present],
+                  "edited": {}, "counts": counts, "problems": problems}
+        for question, entry in items:
+            old = data.get(question)
+            if old is None:
+                change["added"][question] = entry
+            elif old["correct"] != entry["correct"] or old["wrong"] != entry["wrong"]:
+                change["edited"][question] = entry
+        return change
 
 
 def save_to_json(data, file_path="Questions.json"):
@@ -54,10 +274,102 @@ def load_from_json(file_path="Questions.json"):
 
 
 if __name__ == "__main__":
-    qa_dict = parse_questions("Questions.txt")
-    save_to_json(qa_dict, "Questions.json")
+    parser = argparse.ArgumentParser(description="Build the question bank from Questions.txt.")
+    parser.add_argument("source", nargs="?", default="Questions.txt",
+                        help="Questions.txt-style text, or a .json/.bank to convert between formats")
+    parser.add_argument("-o", "--output", help="output file (default Questions.json, .jsonl or .bank)")
+    parser.add_argument("--jsonl", action="store_true", help="write one JSON record per line")
+    parser.add_argument("--compile", action="store_true",
+                        help="write a compiled, memory-mapped Questions.bank that the quiz opens instantly")
+    parser.add_argument("--full", action="store_true",
+                        help="parse every question again instead of only the changed ones (stats are still kept)")
+    parser.add_argument("--near-dups", type=float, nargs="?", const=neardup.THRESHOLD, metavar="SIMILARITY",
+                        help="report questions that are near-duplicates (default: 70%% of words and answers shared)")
+    parser.add_argument("--merge-near-dups", action="store_true",
+                        help="fold near-duplicates into the first copy, with their answers and stats")
+    parser.add_argument("--show", action="store_true", help="print the whole bank after writing it")
+    args = parser.parse_args()
+
+    problems = []
+    saved = "saved to"
+    if args.source.endswith(".bank"):
+        # Export a compiled bank, stats included, back to JSON
+        compiled = bank.CompiledBank(args.source, writable=False)
+        output = args.output or "Questions.json"
+        with open(output, "w", encoding="utf-8") as json_file:
+            json.dump(compiled.to_dict(), json_file, indent=4, ensure_ascii=False)
+        count = len(compiled)
+    elif args.source.endswith(".json"):
+        # Import a JSON bank, stats included, into a compiled bank
+        output = args.output or "Questions.bank"
+        count = bank.write_bank(load_from_json(args.source).items(), output)
+    elif args.jsonl:
+        output = args.output or "Questions.jsonl"
+        count = write_jsonl(validate(iter_questions(args.source, problems), problems), output)
+    else:
+        output = args.output or ("Questions.bank" if args.compile else "Questions.json")
+        stem = os.path.splitext(output)[0]
+        manifest_path = stem + ".build.json"
+        manifest = {} if args.full else load_manifest(manifest_path, args.source)
+        near_dups = args.near_dups
+        if args.merge_near_dups and near_dups is None:
+            near_dups = neardup.THRESHOLD
+        digest = file_digest(args.source) + (f":merged@{near_dups}" if args.merge_near_dups else "")
+        in_use = bank.is_current(output, stem + ".json") if args.compile else not bank.is_current(stem + ".bank", output)
+        if manifest.get("digest") == digest and os.path.exists(output) and in_use and near_dups is None:
+            count = manifest["count"]
+            saved = "already up to date in"
+        else:
+            previous = load_previous(stem + ".json", stem + ".bank", stem + ".journal")
+            blocks, counts = [], {}
+            built = build(args.source, previous, manifest.get("blocks", []), problems, blocks, counts)
+
+            def pairs():
+                for question, entry, _ in built:
+                    yield question, entry
+                if isinstance(previous, bank.CompiledBank):
+                    previous.close()  # all read, and the output may be about to replace it
+
+            items = pairs()
+            if near_dups is not None:
+                # Clustering compares every question with every other, so this needs them all at once
+                built = list(built)
+                items = list(pairs())
+                lines = [line_no for _, _, line_no in built]
+                clusters, similarity = neardup.find_clusters(items, near_dups, counts)
+                for cluster in clusters:
+                    first = items[cluster[0]][1]
+                    for i in cluster[1:]:
+                        message = f"near-duplicate of the question on line {lines[cluster[0]]} ({similarity[i]:.0%} similar)"
+                        if neardup.disagree(first, items[i][1]):
+                            message += ", but the correct answers differ" + (", kept both" if args.merge_near_dups else "")
+                        elif args.merge_near_dups:
+                            message += ", merged"
+                        problems.append((lines[i], message))
+                if args.merge_near_dups:
+                    items = neardup.merge_clusters(items, clusters)
+                problems.sort()
+            if args.compile:
+                count = bank.write_bank(items, output)
+            else:
+                count = write_json_stream(items, output)
+            # The new bank already holds every answer in the journal (load_previous replayed it),
+            # and replaying its records again would undo merged stats: retire it like a finished
+            # compaction, its answers going to the history
+            journal.Journal(stem + ".journal", history=stem + ".history").compact({}, lambda data: None, wait=True)
+            save_manifest(manifest_path, args.source, digest, count, blocks)
+            print(f"♻️  {counts['reused']} unchanged, {counts['parsed']} parsed, "
+                  f"stats kept for {counts['carried']} ({counts['renamed']} edited)")
+            if counts.get("skipped"):
+                print(f"⚠️  {counts['skipped']} candidate pairs in crowded near-duplicate buckets were not compared, "
+                      f"so near-duplicates among them may be missed")
+
+    for line_no, message in problems:
+        print(f"⚠️  {args.source}:{line_no}: {message}")
+    print(f"✅ {count} questions {saved} {output}")
 
-    loaded_dict = load_from_json("Questions.json")
-    print("\n🔄 Loaded back from JSON:")
-    pprint.pprint(loaded_dict)
-    print(len(loaded_dict))
\ No newline at end of file
+    if args.show and output.endswith(".json"):
+        loaded_dict = load_from_json(output)
+        print("\n🔄 Loaded back from JSON:")
+        pprint.pprint(loaded_dict)
+        print(len(loaded_dict))
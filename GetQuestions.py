@@ -1,74 +1,175 @@
-import re
+import os, re, argparse
+from concurrent.futures import ProcessPoolExecutor
 
-# 1. Read input file
-with open("acce.txt", "r", encoding="utf-8") as f:
-    data = f.read()
+# ----------------------------
+# Accessibility-tree question extractor
+# ----------------------------
+# Reads accessibility-tree dumps (acce.txt) of a quiz page and pulls out the
+# "name" of every "text leaf" and "cell" node, in one streaming pass:
+#   "Question N" nodes       start a new question
+#   "Correct Answer ..."     marks the next answer as the correct one (">")
+#   cells                    are dropped when a text leaf in the same question
+#                            repeats their name
+#   labels like A), chapter headings and "Unselected" are skipped
+# The result is written in Questions.txt format, or merged into Questions.txt.
+#   python GetQuestions.py                        acce.txt -> output.txt
+#   python GetQuestions.py dumps/ --merge         every dump in dumps/ -> Questions.txt
 
-# 2. Regex to match "name" + role ("text leaf" or "cell")
-pattern = r'"name": ".*?",[ \n][ \t]*"role": "(?:text leaf|cell)",'
-matches = re.findall(pattern, data, re.DOTALL)
+NODE = re.compile(r'"name": ("(?:[^"\\]|\\.)*"),\s*"role": "(text leaf|cell)",')
+LABEL = re.compile(r'[A-Za-z0-9]+\)')
+QUESTION_MARK = re.compile(r'\bquestion\s*\d+', re.IGNORECASE)
+CHAPTER_MARK = re.compile(r'\bchapter\s*\d+[:]?', re.IGNORECASE)
+CORRECT = "Correct Answer Unselected"
+CHUNK_SIZE = 1 << 20
+MAX_NODE = 1 << 16   # a node longer than this is not carried over to the next chunk
 
-# 3. First pass: collect all valid text leaf names
-text_leaf_names = set()
-for m in matches:
-    role_match = re.search(r'"role": "(.*?)"', m)
-    name_match = re.search(r'"name": "(.*?)"', m, re.DOTALL)
-    if name_match and role_match:
-        name_value = name_match.group(1).strip()
-        role_value = role_match.group(1).strip()
+def iter_nodes(file_path):
+    """Stream (role, raw JSON name) for every text leaf / cell node, reading the dump in chunks."""
+    buffer = ""
+    with open(file_path, "r", encoding="utf-8") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            buffer += chunk
+            end = 0
+            for m in NODE.finditer(buffer):
+                yield m.group(2), m.group(1)
+                end = m.end()
+            if not chunk:
+                return
+            # Keep only the last node, which may be cut off at the end of the chunk, for the
+            # next round; everything before it has been matched or can't match any more
+            start = buffer.rfind('"name"')
+            while start > 0 and buffer[start-1] == "\\":
+                start = buffer.rfind('"name"', 0, start)  # \"name\" inside a string value
+            if start < end or len(buffer) - start > MAX_NODE:
+                start = max(end, len(buffer) - 8)
+            buffer = buffer[start:]
 
-        # Skip standalone labels like A), 1)
-        if re.fullmatch(r'[A-Za-z0-9]+\)', name_value):
-            continue
-        if re.search(r'\bchapter\s*\d+[:]?|\bquestion\s*\d+', name_value, re.IGNORECASE):
-            continue
-        if name_value == "Unselected" or name_value == "Correct Answer Unselected":
+def resolve(group):
+    """Apply the cell and correct-answer rules to one question's nodes. Returns its names."""
+    leaves = {name for role, name in group if role == "text leaf"}
+    names = []
+    prepend_next = False
+    for role, name in group:
+        if role is None:
+            prepend_next = True
             continue
-        if "\\" in name_value:
+        # Skip "cell" if duplicate of text leaf
+        if role == "cell" and name in leaves:
             continue
+        # Only prepend ">" to the first valid item after Correct Answer Unselected
+        if prepend_next:
+            name = ">" + name
+            prepend_next = False
+        names.append(name)
+    return names
 
-        if role_value == "text leaf":
-            text_leaf_names.add(name_value)
-
-# 4. Second pass: process all roles in order, applying rules
-names = []
-prepend_next = False
-
-for m in matches:
-    role_match = re.search(r'"role": "(.*?)"', m)
-    name_match = re.search(r'"name": "(.*?)"', m, re.DOTALL)
-    if name_match and role_match:
-        name_value = name_match.group(1).strip()
-        role_value = role_match.group(1).strip()
-
-        # Skip standalone labels like A), 1)
-        if re.fullmatch(r'[A-Za-z0-9]+\)', name_value):
+def iter_groups(file_path, counts):
+    """Stream (names, starts_with_question_marker) groups of names, split at "Question N" nodes.
+       counts["nodes"] and counts["kept"] are updated as nodes go by."""
+    group = []
+    marked = False
+    for role, raw in iter_nodes(file_path):
+        counts["nodes"] += 1
+        if "\\" in raw:
             continue
-        if re.search(r'\bchapter\s*\d+[:]?|\bquestion\s*\d+', name_value, re.IGNORECASE):
+        name = raw[1:-1].strip()
+        # Skip standalone labels like A), 1)
+        if LABEL.fullmatch(name):
             continue
-        if name_value == "Unselected":
+        if QUESTION_MARK.search(name):
+            names = resolve(group)
+            counts["kept"] += len(names)
+            yield names, marked
+            group, marked = [], True
             continue
-        if "\\" in name_value:
+        if CHAPTER_MARK.search(name) or name == "Unselected":
             continue
-
         # Handle "Correct Answer Unselected"
-        if name_value == "Correct Answer Unselected":
-            prepend_next = True
-            continue
+        group.append((None, None) if name == CORRECT else (role, name))
+    names = resolve(group)
+    counts["kept"] += len(names)
+    yield names, marked
 
-        # Skip "cell" if duplicate of text leaf
-        if role_value == "cell" and name_value in text_leaf_names:
+def extract(file_path, flat=False):
+    """Extract one dump. Returns (blocks, counts); each block is the text of one question in
+       Questions.txt format, or with flat every name on its own line like the old output.txt."""
+    counts = {"nodes": 0, "kept": 0}
+    blocks = []
+    for names, marked in iter_groups(file_path, counts):
+        if not names:
             continue
+        if flat:
+            blocks.append("\n".join(names))
+        elif marked:
+            blocks.append("\n".join([names[0].lstrip(">")] + ["    " + name for name in names[1:]]))
+        else:
+            counts["kept"] -= len(names)  # text before the first question, e.g. page headers
+    return blocks, counts
 
-        # Only prepend ">" to the first valid item after Correct Answer Unselected
-        if prepend_next:
-            name_value = ">" + name_value
-            prepend_next = False
+# ----------------------------
+# Batch mode
+# ----------------------------
+def find_dumps(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.endswith((".txt", ".json")) and os.path.isfile(os.path.join(path, name)))
+        else:
+            files.append(path)
+    return files
+
+def extract_all(files, flat=False, jobs=None):
+    """extract() every file, across a process pool when there is more than one. Results keep file order."""
+    if len(files) == 1:
+        return [extract(files[0], flat)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(extract, files, [flat]*len(files)))
+
+def merge_into(blocks, questions_file="Questions.txt"):
+    """Append blocks whose question is not in questions_file yet. Returns how many were added."""
+    from CreateDictionary import iter_questions
+    known = set()
+    ends_with_newline = True
+    if os.path.exists(questions_file):
+        known = {question for question, _, _, _ in iter_questions(questions_file)}
+        with open(questions_file, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                ends_with_newline = f.read(1) == b"\n"
+    added = []
+    for block in blocks:
+        question = block.split("\n", 1)[0]
+        if question not in known:
+            known.add(question)
+            added.append(block)
+    if added:
+        with open(questions_file, "a", encoding="utf-8") as f:
+            f.write(("" if ends_with_newline else "\n") + "\n".join(added) + "\n")
+    return len(added)
 
-        names.append(name_value)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract questions from accessibility-tree dumps.")
+    parser.add_argument("inputs", nargs="*", default=["acce.txt"], help="dump files or directories of dumps")
+    parser.add_argument("-o", "--output", default="output.txt", help="where to write the questions")
+    parser.add_argument("--merge", nargs="?", const="Questions.txt", metavar="FILE",
+                        help="append new questions to FILE (default Questions.txt) instead of writing --output")
+    parser.add_argument("--flat", action="store_true", help="one name per line, without question structure")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes for batch mode (default: all cores)")
+    args = parser.parse_args()
 
-# 5. Save output
-with open("output.txt", "w", encoding="utf-8") as f:
-    f.write("\n".join(names))
+    files = find_dumps(args.inputs)
+    results = extract_all(files, args.flat, args.jobs)
+    blocks = [block for file_blocks, _ in results for block in file_blocks]
+    nodes = sum(counts["nodes"] for _, counts in results)
+    kept = sum(counts["kept"] for _, counts in results)
 
-print(f"Extracted {len(names)} names (skipped {len(matches)-len(names)}) and saved them to output.txt")
\ No newline at end of file
+    if args.merge:
+        added = merge_into(blocks, args.merge)
+        print(f"Extracted {len(blocks)} questions from {len(files)} file(s), added {added} new ones to {args.merge}")
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(blocks))
+        print(f"Extracted {kept} names (skipped {nodes-kept}) from {len(files)} file(s) and saved them to {args.output}")
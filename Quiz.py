@@ -1,4 +1,13 @@
-import pygame, random, json, sys, time, ctypes
+from perf import profiler, StartupTimer
+startup = StartupTimer()  # first, so the startup report covers the imports
+import pygame, random, json, os, sys, time, ctypes
+import journal, bank
+from selection import Selector
+from lrucache import LRUCache
+from fonts import get_font
+from search import SearchIndex
+from images import ImageLoader, split_images
+startup.phase("imports")
 
 # ----------------------------
 # High-DPI awareness
@@ -9,14 +18,21 @@ except: pass
 # ----------------------------
 # Config
 # ----------------------------
+if getattr(sys, "frozen", False):
+    os.chdir(os.path.dirname(sys.executable))  # the packaged quiz keeps its files next to quiz.exe
 CONFIG_FILE = "config.json"
 JSON_FILE = "Questions.json"
+JOURNAL_FILE = "Questions.journal"
+BANK_FILE = "Questions.bank"
+HISTORY_FILE = "Questions.history"
+SOURCE_FILE = "Questions.txt"
+MANIFEST_FILE = "Questions.build.json"
 
 def load_config():
     with open(CONFIG_FILE,"r",encoding="utf-8") as f:
         return json.load(f)
 def save_config(cfg):
-    with open(CONFIG_FILE,"w",encoding="utf-8") as f:
+    with profiler.span("save_config"), open(CONFIG_FILE,"w",encoding="utf-8") as f:
         json.dump(cfg,f,indent=4)
 
 config = load_config()
@@ -28,11 +44,28 @@ dragging_scroll = config.get("DRAG_SCROLLBAR",False)
 manual_question_font = config.get("MANUAL_QUESTION_FONT",None)
 manual_answer_font = config.get("MANUAL_ANSWER_FONT",None)
 manual_ui_font = config.get("MANUAL_UI_FONT",None)
+JOURNAL_COMPACT_EVERY = config.get("JOURNAL_COMPACT_EVERY", 200)
+PRACTICE_NO_REPEAT = config.get("PRACTICE_NO_REPEAT", False)
+REVIEW_SKIP_DELAY = config.get("REVIEW_SKIP_DELAY", 60)
+PRACTICE_WEIGHTING = config.get("PRACTICE_WEIGHTING", "ratio")
+KEEP_ANSWER_HISTORY = config.get("KEEP_ANSWER_HISTORY", True)
+HOT_RELOAD_INTERVAL = config.get("HOT_RELOAD_INTERVAL", 2)   # seconds between checks of Questions.txt, 0 = off
+study_topic = config.get("STUDY_TOPIC", "")
+profiler.enabled = config.get("PERF_OVERLAY", False)
+PERF_EXPORT_FILE = config.get("PERF_EXPORT_FILE", "perf_trace.json")
+STARTUP_REPORT = config.get("STARTUP_REPORT", False)
+STARTUP_REPORT_FILE = config.get("STARTUP_REPORT_FILE", "startup_report.txt")
+IMAGE_CACHE_MB = config.get("IMAGE_CACHE_MB", 64)
 
 # ----------------------------
 # Load / Save Questions
 # ----------------------------
 def load_questions():
+    if bank.is_current(BANK_FILE, JSON_FILE):
+        # Compiled bank: opens in constant time, text is read as questions come up
+        data = bank.CompiledBank(BANK_FILE)
+        answer_journal.replay(data)
+        return data
     with open(JSON_FILE, "r", encoding="utf-8") as f:
         data = json.load(f)
     for q in data:
@@ -42,67 +75,88 @@ def load_questions():
             for key in ["right","wrong","times_seen"]:
                 if key not in data[q]["stats"]:
                     data[q]["stats"][key]=0
+    answer_journal.replay(data)
     return data
 
 def save_questions(data):
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(data,f,indent=4,ensure_ascii=False)
+    with profiler.span("save_questions"):
+        if isinstance(data, bank.CompiledBank):
+            data.flush()  # stats are already updated in place
+        else:
+            journal.atomic_write_json(data,JSON_FILE,indent=4,ensure_ascii=False)
+
+def record_event(event, question):
+    # O(1) per event; the full bank is only rewritten when the journal is compacted
+    with profiler.span("journal"):
+        answer_journal.record(event, question, QuestionsAnswers[question])
+        answer_journal.maybe_compact(QuestionsAnswers, save_questions)
+    selector.update(question)
 
-QuestionsAnswers = load_questions()
+answer_journal = journal.Journal(JOURNAL_FILE, JOURNAL_COMPACT_EVERY, HISTORY_FILE if KEEP_ANSWER_HISTORY else None)
+QuestionsAnswers = {}
 
 # ----------------------------
 # Pygame Setup
 # ----------------------------
-pygame.init()
 WIDTH, HEIGHT = 1280,720
-screen = pygame.display.set_mode((WIDTH,HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Quiz Game")
+screen = None
+
+def init_display():
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH,HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("Quiz Game")
+
 WHITE, BLACK, GRAY, GREEN, RED, SCROLL_COLOR = (255,255,255),(0,0,0),(200,200,200),(100,200,100),(200,100,100),(150,150,150)
 
 # ----------------------------
 # Wrapping functions
 # ----------------------------
-def render_wrapped_text_in_box(text, font, color, box_width):
+# Wrapped layouts and rendered lines are cached by (text, font size, bold, width, color),
+# so a frame that shows the same question again does no measuring or rendering.
+text_cache = LRUCache(config.get("TEXT_CACHE_SIZE", 512))
+
+def wrap_lines(text, font, max_width):
     words = text.split(' ')
     lines = []
     current_line = ""
     for word in words:
         test_line = current_line + word + " "
-        if font.size(test_line)[0] <= box_width-10:
-            current_line = test_line
-        else:
-            lines.append(current_line.strip())
-            current_line = word + " "
-    if current_line:
-        lines.append(current_line.strip())
-    surfaces=[]
-    total_height=0
-    for line in lines:
-        surf = font.render(line, True, color)
-        surfaces.append(surf)
-        total_height += surf.get_height()
-    return surfaces, total_height
-
-def render_wrapped_text(text, font, color, max_width):
-    words = text.split(' ')
-    lines=[]
-    current_line=""
-    for word in words:
-        test_line = current_line + word + " "
-        if font.size(test_line)[0]<=max_width:
+        if font.size(test_line)[0] <= max_width:
             current_line = test_line
         else:
             lines.append(current_line.strip())
             current_line = word + " "
     if current_line:
         lines.append(current_line.strip())
-    surfaces=[]
-    y_offset=0
-    for line in lines:
-        surf = font.render(line, True, color)
-        surfaces.append((surf, y_offset))
-        y_offset += surf.get_height()+5
-    return surfaces
+    return lines
+
+def render_wrapped_text_in_box(text, size, color, box_width, bold=False):
+    def create():
+        with profiler.span("render"):
+            font = get_font(size, bold)
+            surfaces = [font.render(line, True, color) for line in wrap_lines(text, font, box_width-10)]
+            return surfaces, sum(surf.get_height() for surf in surfaces)
+    return text_cache.get_or_create(("box", text, size, bold, box_width, color), create)
+
+def render_wrapped_text(text, size, color, max_width, bold=False):
+    def create():
+        with profiler.span("render"):
+            font = get_font(size, bold)
+            surfaces=[]
+            y_offset=0
+            for line in wrap_lines(text, font, max_width):
+                surf = font.render(line, True, color)
+                surfaces.append((surf, y_offset))
+                y_offset += surf.get_height()+5
+            return surfaces
+    return text_cache.get_or_create(("wrap", text, size, bold, max_width, color), create)
+
+def render_text(text, size, color, bold=False):
+    def create():
+        with profiler.span("render"):
+            return get_font(size, bold).render(text, True, color)
+    return text_cache.get_or_create(("line", text, size, bold, color), create)
 
 # ----------------------------
 # Fonts
@@ -110,7 +164,7 @@ def render_wrapped_text(text, font, color, max_width):
 def get_question_font(width):
     size = max(24, int(width*0.04))
     if manual_question_font is not None: size = manual_question_font
-    return pygame.font.SysFont("arial", size, bold=True)
+    return size
 def get_answer_font(height):
     size = max(20,int(height*0.035))
     if manual_answer_font is not None: size = manual_answer_font
@@ -120,6 +174,40 @@ def get_ui_font(height):
     if manual_ui_font is not None: size = manual_ui_font
     return size
 
+# ----------------------------
+# Images
+# ----------------------------
+# [img: path] in a question or answer is drawn in a band of fixed height, so the
+# layout is known before the file is decoded (see images.py).
+image_loader = ImageLoader(IMAGE_CACHE_MB*1024*1024, lambda: pygame.event.post(pygame.event.Event(IMAGE_READY_EVENT)))
+
+def question_image_height(height):
+    return int(height*0.35)
+
+def answer_image_height(height):
+    return int(height*0.2)
+
+def answer_image_space(paths, height):
+    return answer_image_height(height)+int(height*0.01) if paths else 0
+
+def image_row(paths, left, top, width, height):
+    """(rect, path) slots for images side by side in a width x height band."""
+    w = width//len(paths)
+    return [(pygame.Rect(left+i*w, top, w, height), path) for i, path in enumerate(paths)]
+
+def draw_image(path, rect, box):
+    surf = image_loader.get(path, box)
+    if surf:
+        screen.blit(surf, surf.get_rect(center=rect.center))
+        return
+    pygame.draw.rect(screen, SCROLL_COLOR, rect, 1, border_radius=8)
+    label = render_text("loading..." if surf is None else f"can't load {path}", 18, SCROLL_COLOR)
+    screen.blit(label, label.get_rect(center=rect.center))
+
+def answer_label(ans):
+    text, paths = split_images(ans)
+    return text or ", ".join(paths)
+
 # ----------------------------
 # Answer boxes
 # ----------------------------
@@ -129,12 +217,13 @@ def create_answer_boxes(answers,width,height,question_height):
     gap=int(height*0.03)
     start_y=int(height*0.05)+question_height+gap
     y=start_y
+    ans_size = get_answer_font(height)
     for ans in answers:
-        ans_font = pygame.font.SysFont("arial", get_answer_font(height))
-        wrapped_surfs,total_height = render_wrapped_text_in_box(ans, ans_font, BLACK, box_width)
-        box_height = total_height + int(height*0.02)
+        text, paths = split_images(ans)
+        total_height = render_wrapped_text_in_box(text, ans_size, BLACK, box_width)[1] if text else 0
+        box_height = total_height + answer_image_space(paths, height) + int(height*0.02)
         rect = pygame.Rect((width-box_width)//2, y, box_width, box_height)
-        boxes.append((rect, ans, ans_font))
+        boxes.append((rect, ans, ans_size))
         y += box_height+gap
     return boxes
 
@@ -142,26 +231,129 @@ def create_answer_boxes(answers,width,height,question_height):
 # Question selection
 # ----------------------------
 mode="Arcade"
-def get_random_question():
-    global QuestionsAnswers
-    if mode=="Arcade":
-        question = random.choice(list(QuestionsAnswers.keys()))
-    else:
-        questions=list(QuestionsAnswers.keys())
-        weights=[]
-        for q in questions:
-            stats = QuestionsAnswers[q]["stats"]
-            right = stats["right"] if stats["right"]>0 else 1
-            wrong = stats["wrong"] if stats["wrong"]>0 else 1
-            weights.append(wrong/right)
-        question=random.choices(questions,weights=weights,k=1)[0]
+all_keys = []
+question_keys = []      # all_keys, or the questions matching study_topic
+selector = None
+search_index = None
+
+def set_questions(data):
+    """Install a question bank and drop the selection structures built for the previous one."""
+    global QuestionsAnswers, all_keys
+    QuestionsAnswers = data
+    all_keys = data.key_list() if isinstance(data, bank.CompiledBank) else list(data.keys())
+    if search_index is not None:
+        search_index.update(data)
+    set_topic(study_topic)
+
+def get_search_index():
+    # Built the first time a topic is used; a compiled bank is decoded in full here
+    global search_index
+    if search_index is None:
+        search_index = SearchIndex(QuestionsAnswers)
+    return search_index
+
+def set_topic(topic):
+    """Restrict every mode to the questions matching topic ("" for the whole bank).
+       A topic nothing matches is kept but leaves the whole bank in play."""
+    global study_topic, question_keys, selector
+    study_topic = topic.strip()
+    matches = get_search_index().search(study_topic) if study_topic else []
+    question_keys = matches or all_keys
+    selector = Selector(QuestionsAnswers, question_keys, no_repeat=PRACTICE_NO_REPEAT, skip_delay=REVIEW_SKIP_DELAY,
+                        weighting=PRACTICE_WEIGHTING)
+    return len(matches)
+
+# ----------------------------
+# Hot reload
+# ----------------------------
+# Edits to Questions.txt are applied to the running quiz: only new or edited
+# blocks are parsed (CreateDictionary's incremental build), stats stay with
+# their questions, and the selection structures get only the questions that
+# came or went. A removed question that is on screen stays until moving on.
+source_watcher = None
+retired = set()
+
+def reload_source():
+    """Apply Questions.txt edits, if any. Returns True if the bank changed."""
+    global question_keys, answers, correct_answers, layout_dirty
+    if isinstance(QuestionsAnswers, bank.CompiledBank):
+        return False  # fixed layout: recompile with CreateDictionary.py --compile instead
+    with profiler.span("hot reload"):
+        change = source_watcher.poll(QuestionsAnswers)
+        if change is None or not (change["added"] or change["removed"] or change["edited"]):
+            return False
+        discard_prefetch()
+        for entry in change["added"].values():
+            entry.setdefault("stats", {"right":0,"wrong":0,"times_seen":0})
+        old_keys = set(question_keys)
+        # Same entry objects, in the file's order, new questions with the stats build() carried over
+        entries = {q: change["added"].get(q) or QuestionsAnswers[q] for q, _ in change["items"]}
+        for q, entry in change["edited"].items():
+            entries[q]["correct"], entries[q]["wrong"] = entry["correct"], entry["wrong"]
+        for q in change["removed"]:
+            if q == question:
+                retired.add(q)
+                entries[q] = QuestionsAnswers[q]
+        QuestionsAnswers.clear()
+        QuestionsAnswers.update(entries)
+        all_keys[:] = [q for q in QuestionsAnswers if q not in retired]
+        get_search_index().update({q: QuestionsAnswers[q] for q in all_keys})
+        matches = search_index.search(study_topic) if study_topic else []
+        if study_topic and (not matches or question_keys is all_keys):
+            set_topic(study_topic)  # the topic gained its first or lost its last match
+        else:
+            if study_topic:
+                question_keys[:] = matches
+            new_keys = set(question_keys)
+            for q in old_keys - new_keys:
+                selector.remove(q)
+            for q in new_keys - old_keys:
+                selector.add(q)
+        if question in change["edited"] and not show_feedback:
+            data = QuestionsAnswers[question]
+            answers = data["correct"] + data["wrong"]
+            random.shuffle(answers)
+            correct_answers = data["correct"]
+            layout_dirty = True
+        # New questions have to be in Questions.json for their answers in the journal to replay
+        answer_journal.save({q: QuestionsAnswers[q] for q in all_keys}, save_questions)
+    counts = change["counts"]
+    print(f"♻️  {SOURCE_FILE} reloaded: {len(change['added'])} added, {len(change['removed'])} removed, "
+          f"{len(change['edited'])} edited ({counts['parsed']} blocks parsed, {counts['reused']} unchanged)")
+    if change["problems"]:
+        print(f"⚠️  {len(change['problems'])} warnings, run CreateDictionary.py to list them")
+    return True
+
+def grade_review(question, correct):
+    selector.grade(question, correct)
+
+def answer_question(ans):
+    """Count, schedule and journal ans as the answer to the current question.
+       Returns the feedback to show, "correct" or "wrong"."""
+    feedback = "correct" if ans in correct_answers else "wrong"
+    QuestionsAnswers[question]["stats"]["right" if feedback=="correct" else "wrong"] += 1
+    grade_review(question, feedback=="correct")
+    record_event(feedback, question)
+    return feedback
+
+def pick_question():
+    with profiler.span("select"):
+        question = selector.pick(mode)
     data = QuestionsAnswers[question]
-    data["stats"]["times_seen"] += 1
-    save_questions(QuestionsAnswers)
     answers = data["correct"] + data["wrong"]
     random.shuffle(answers)
     return question,answers,data["correct"]
 
+def present_question(question):
+    # Counted when it is shown, not when it is picked, so a discarded prefetch leaves no trace
+    QuestionsAnswers[question]["stats"]["times_seen"] += 1
+    record_event("seen", question)
+
+def get_random_question():
+    question,answers,correct = pick_question()
+    present_question(question)
+    return question,answers,correct
+
 # ----------------------------
 # Buttons
 # ----------------------------
@@ -176,34 +368,36 @@ def create_buttons(width,height):
                   "U-":pygame.Rect(int(width*0.72),height-80,int(width*0.05),30),
                   "UDefault":pygame.Rect(int(width*0.79),height-80,int(width*0.1),30)}
     mode_buttons = {"Practice":pygame.Rect(int(width*0.05),height-40,int(width*0.1),30),
-                    "Arcade":pygame.Rect(int(width*0.17),height-40,int(width*0.1),30)}
+                    "Arcade":pygame.Rect(int(width*0.17),height-40,int(width*0.1),30),
+                    "Review":pygame.Rect(int(width*0.29),height-40,int(width*0.1),30)}
     skip_button = pygame.Rect(width-120,height-40,100,30)
-    return question_buttons,answer_buttons,ui_buttons,mode_buttons,skip_button
+    topic_box = pygame.Rect(int(width*0.41),height-40,max(100,int(width*0.59)-140),30)
+    return question_buttons,answer_buttons,ui_buttons,mode_buttons,skip_button,topic_box
 
 # ----------------------------
-# Initialize first question
+# Question state
 # ----------------------------
-question,answers,correct_answers = get_random_question()
-font_q = get_question_font(WIDTH)
-wrapped_surfaces = render_wrapped_text(question,font_q,BLACK,WIDTH-100)
-question_height = sum([surf.get_height()+5 for surf,_ in wrapped_surfaces])
-boxes=create_answer_boxes(answers,WIDTH,HEIGHT,question_height)
+question,answers,correct_answers = None,[],[]
 selected=None
 show_feedback=False
 feedback_start=0
 feedback_type=None
 chosen_answer=None
-
-question_buttons,answer_buttons,ui_buttons,buttons_mode,skip_button = create_buttons(WIDTH,HEIGHT)
+scrollbar_rect=None
+editing_topic=None      # text being typed into the topic box, None when not editing
 
 # ----------------------------
 # Scroll helpers
 # ----------------------------
-def calculate_total_height():
-    question_height = sum([surf.get_height()+5 for surf,_ in wrapped_surfaces])
+def calculate_total_height(question_height, boxes):
     answer_height = sum([rect.height+int(HEIGHT*0.03) for rect,_,_ in boxes])
     return int(HEIGHT*0.05)+question_height+int(HEIGHT*0.03)+answer_height+100
 
+def draw_button(rect, label, size, color=GRAY):
+    pygame.draw.rect(screen,color,rect,border_radius=5)
+    surf = render_text(label, size, BLACK)
+    screen.blit(surf,(rect.centerx-surf.get_width()//2,rect.centery-surf.get_height()//2))
+
 def draw_scrollbar(total_height):
     if not SHOW_SCROLLBAR or total_height<=HEIGHT: return None
     bar_height = max(int(HEIGHT*HEIGHT/total_height),20)
@@ -214,175 +408,404 @@ def draw_scrollbar(total_height):
     return bar_rect
 
 # ----------------------------
-# Main loop
+# Layout and redraw tracking
 # ----------------------------
-running=True
-while running:
-    screen.fill(WHITE)
+# The main loop sleeps in pygame.event.wait and only lays out or draws when
+# something changed. Drawing is clipped to the dirty area and only that area is
+# pushed to the display.
+NEXT_QUESTION_EVENT = pygame.USEREVENT+1
+SOURCE_CHECK_EVENT = pygame.USEREVENT+2
+IMAGE_READY_EVENT = pygame.USEREVENT+3
+layout_dirty = True
+dirty_rects = []
+dirty_area = None
+
+def mark_dirty(rect=None):
+    dirty_rects.append(screen.get_rect() if rect is None else pygame.Rect(rect))
+
+def layout_key():
+    return WIDTH,HEIGHT,manual_question_font,manual_answer_font
+
+def layout_question(question, answers):
+    """Everything drawn for a question at the current window size and fonts."""
+    q_size = get_question_font(WIDTH)
+    text, paths = split_images(question)
+    wrapped = render_wrapped_text(text,q_size,BLACK,WIDTH-100,bold=True) if text else []
+    question_height = sum([surf.get_height()+5 for surf,_ in wrapped])
+    slots = []
+    if paths:
+        slots = image_row(paths, 50, int(HEIGHT*0.05)+question_height, WIDTH-100, question_image_height(HEIGHT))
+        question_height += question_image_height(HEIGHT)+5
+    answer_boxes = create_answer_boxes(answers,WIDTH,HEIGHT,question_height)
+    for rect, ans, _ in answer_boxes:
+        paths = split_images(ans)[1]
+        if paths:
+            slots += image_row(paths, rect.left+5, rect.top+int(HEIGHT*0.01), rect.width-10, answer_image_height(HEIGHT))
+    return layout_key(), (q_size, wrapped, question_height, answer_boxes, calculate_total_height(question_height, answer_boxes), slots)
+
+def install_layout(layout):
+    global q_size,wrapped_surfaces,question_height,boxes,total_height_content,image_slots
+    q_size,wrapped_surfaces,question_height,boxes,total_height_content,image_slots = layout
+    mark_dirty()
+
+def relayout():
+    global WIDTH,HEIGHT,layout_dirty,question_buttons,answer_buttons,ui_buttons,buttons_mode,skip_button,topic_box
     WIDTH,HEIGHT = screen.get_size()
-    question_buttons,answer_buttons,ui_buttons,buttons_mode,skip_button = create_buttons(WIDTH,HEIGHT)
-    font_q = get_question_font(WIDTH)
-    wrapped_surfaces = render_wrapped_text(question,font_q,BLACK,WIDTH-100)
-    question_height = sum([surf.get_height()+5 for surf,_ in wrapped_surfaces])
-    boxes=create_answer_boxes(answers,WIDTH,HEIGHT,question_height)
-    total_height_content = calculate_total_height()
+    question_buttons,answer_buttons,ui_buttons,buttons_mode,skip_button,topic_box = create_buttons(WIDTH,HEIGHT)
+    install_layout(layout_question(question, answers)[1])
+    layout_dirty = False
+
+def draw_frame():
+    global scrollbar_rect
+    global dirty_area
+    if profiler.enabled:
+        overlay = render_perf_overlay()
+        mark_dirty(perf_rect)
+    area = dirty_area = dirty_rects[0].unionall(dirty_rects[1:]).clip(screen.get_rect())
+    dirty_rects.clear()
+    screen.set_clip(area)
+    screen.fill(WHITE)
     scrollbar_rect = draw_scrollbar(total_height_content)
 
     # Feedback
     if show_feedback:
-        font_feedback = pygame.font.SysFont("arial", max(40,int(min(WIDTH,HEIGHT)*0.08)),bold=True)
+        feedback_size = max(40,int(min(WIDTH,HEIGHT)*0.08))
         if feedback_type=="correct":
             screen.fill(GREEN)
-            msg=font_feedback.render("Correct! []~(￣▽￣)~*",True,BLACK)
+            msg=render_text("Correct! []~(￣▽￣)~*",feedback_size,BLACK,bold=True)
             screen.blit(msg,(WIDTH//2-msg.get_width()//2, HEIGHT//2-msg.get_height()//2))
-            if time.time()-feedback_start>NEXT_DELAY:
-                show_feedback=False
-                question,answers,correct_answers=get_random_question()
-                boxes=create_answer_boxes(answers,WIDTH,HEIGHT,question_height)
-                selected=None
         elif feedback_type=="wrong":
             screen.fill(RED)
-            msg=font_feedback.render("Wrong",True,BLACK)
+            msg=render_text("Wrong",feedback_size,BLACK,bold=True)
             screen.blit(msg,(WIDTH//2-msg.get_width()//2, HEIGHT//5))
-            small_font = pygame.font.SysFont("arial", max(20,int(HEIGHT*0.03)))
-            screen.blit(small_font.render(f"You chose: {chosen_answer}", True, BLACK),(50,HEIGHT//2))
-            screen.blit(small_font.render("Correct: "+", ".join(correct_answers), True, BLACK),(50,HEIGHT//2+40))
+            small_size = max(20,int(HEIGHT*0.03))
+            screen.blit(render_text(f"You chose: {answer_label(chosen_answer)}", small_size, BLACK),(50,HEIGHT//2))
+            screen.blit(render_text("Correct: "+", ".join(map(answer_label, correct_answers)), small_size, BLACK),(50,HEIGHT//2+40))
     else:
         y_start=int(HEIGHT*0.05)+scroll_offset
         for surf,offset in wrapped_surfaces:
             screen.blit(surf,(50,y_start+offset))
-        for rect, ans, ans_font in boxes:
+        for rect, ans, ans_size in boxes:
             rect_scroll = rect.move(0,scroll_offset)
+            if not rect_scroll.colliderect(area): continue
             pygame.draw.rect(screen,GRAY,rect_scroll,border_radius=10)
-            wrapped_surfs,total_height = render_wrapped_text_in_box(ans,ans_font,BLACK,rect.width)
-            y_offset = rect_scroll.top + (rect.height - total_height)//2
+            text, paths = split_images(ans)
+            if not text: continue
+            wrapped_surfs,total_height = render_wrapped_text_in_box(text,ans_size,BLACK,rect.width)
+            image_space = answer_image_space(paths, HEIGHT)
+            y_offset = rect_scroll.top + image_space + (rect.height - image_space - total_height)//2
             for surf in wrapped_surfs:
                 screen.blit(surf,(rect_scroll.left+5,y_offset))
                 y_offset += surf.get_height()
+        for rect, path in image_slots:
+            rect_scroll = rect.move(0,scroll_offset)
+            if rect_scroll.colliderect(area):
+                draw_image(path, rect_scroll, rect.size)
         if config.get("SHOW_STATS_INFO", True):
                 stats = QuestionsAnswers[question]["stats"]
-                screen.blit(pygame.font.SysFont("arial",20).render(
-                    f"Right: {stats['right']} | Wrong: {stats['wrong']} | Seen: {stats['times_seen']}", True, BLACK
+                screen.blit(render_text(
+                    f"Right: {stats['right']} | Wrong: {stats['wrong']} | Seen: {stats['times_seen']}", 20, BLACK
                 ), (50, HEIGHT-120))
-        ui_font = pygame.font.SysFont("arial", get_ui_font(HEIGHT))
+        ui_size = get_ui_font(HEIGHT)
         # Draw buttons
-        for label, rect in question_buttons.items():
-            pygame.draw.rect(screen,GRAY,rect,border_radius=5)
-            screen.blit(ui_font.render(label, True, BLACK),(rect.centerx-ui_font.size(label)[0]//2,rect.centery-ui_font.size(label)[1]//2))
-        for label, rect in answer_buttons.items():
-            pygame.draw.rect(screen,GRAY,rect,border_radius=5)
-            screen.blit(ui_font.render(label, True, BLACK),(rect.centerx-ui_font.size(label)[0]//2,rect.centery-ui_font.size(label)[1]//2))
-        for label, rect in ui_buttons.items():
-            pygame.draw.rect(screen,GRAY,rect,border_radius=5)
-            screen.blit(ui_font.render(label, True, BLACK),(rect.centerx-ui_font.size(label)[0]//2,rect.centery-ui_font.size(label)[1]//2))
+        for buttons in (question_buttons, answer_buttons, ui_buttons):
+            for label, rect in buttons.items():
+                draw_button(rect, label, ui_size)
         for label, rect in buttons_mode.items():
-            pygame.draw.rect(screen,GREEN if mode==label else GRAY,rect,border_radius=5)
-            screen.blit(ui_font.render(label, True, BLACK),(rect.centerx-ui_font.size(label)[0]//2,rect.centery-ui_font.size(label)[1]//2))
+            draw_button(rect, label, ui_size, GREEN if mode==label else GRAY)
         if ENABLE_SKIP_BUTTON:
-            pygame.draw.rect(screen,GRAY,skip_button,border_radius=5)
-            screen.blit(ui_font.render("Skip", True, BLACK),(skip_button.centerx-ui_font.size("Skip")[0]//2, skip_button.centery-ui_font.size("Skip")[1]//2))
-
-    pygame.display.flip()
-
-    # ----------------------------
-    # Event handling
-    # ----------------------------
-    for event in pygame.event.get():
-        if event.type==pygame.QUIT:
-            save_questions(QuestionsAnswers)
-            config["SCROLL_OFFSET"]=scroll_offset
-            config["DRAG_SCROLLBAR"]=dragging_scroll
-            config["MANUAL_QUESTION_FONT"]=manual_question_font
-            config["MANUAL_ANSWER_FONT"]=manual_answer_font
-            config["MANUAL_UI_FONT"]=manual_ui_font
-            save_config(config)
-            running=False
-            sys.exit()
-        elif event.type==pygame.VIDEORESIZE:
-            WIDTH,HEIGHT = event.w,event.h
-            screen=pygame.display.set_mode((WIDTH,HEIGHT),pygame.RESIZABLE)
-        elif event.type==pygame.MOUSEBUTTONDOWN:
-            pos = event.pos
-            if event.button == 1:
-                clicked_ui = False
-
-                # Scrollbar dragging
-                if SHOW_SCROLLBAR and scrollbar_rect and scrollbar_rect.collidepoint(pos):
-                    dragging_scroll = True
-                    config["DRAG_SCROLLBAR"] = True
-                    save_config(config)
+            draw_button(skip_button, "Skip", ui_size)
+        draw_topic_box(ui_size)
+    if profiler.enabled:
+        screen.blit(overlay, perf_rect)
+
+    screen.set_clip(None)
+    pygame.display.update(area)
+
+def topic_label():
+    if editing_topic is not None:
+        found = len(get_search_index().search(editing_topic)) if editing_topic.strip() else len(all_keys)
+        return f"Topic: {editing_topic}|  ({found} questions)"
+    if not study_topic:
+        return "Topic: all questions  (press / to filter)"
+    if question_keys is all_keys:
+        return f"Topic: {study_topic}  (no matches, using all)"
+    return f"Topic: {study_topic}  ({len(question_keys)} questions)"
+
+def draw_topic_box(size):
+    pygame.draw.rect(screen, WHITE if editing_topic is not None else GRAY, topic_box, border_radius=5)
+    pygame.draw.rect(screen, BLACK, topic_box, 1, border_radius=5)
+    surf = render_text(topic_label(), size, BLACK)
+    screen.set_clip(topic_box.clip(screen.get_clip()))
+    screen.blit(surf,(topic_box.left+8,topic_box.centery-surf.get_height()//2))
+    screen.set_clip(dirty_area)
+
+# ----------------------------
+# Performance overlay (F3, F4 exports)
+# ----------------------------
+perf_rect = None
+
+def render_perf_overlay():
+    """Frame time and per-phase percentiles from the profiler, for the top-right corner."""
+    global perf_rect
+    with profiler.span("overlay"):
+        font = get_font(15, family="consolas")
+        lines = [f"{'phase':<15}{'n':>5}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  ms"]
+        lines += [f"{name[:15]:<15}{n:>5}{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}{worst:>8.2f}"
+                  for name, n, p50, p95, p99, worst in profiler.summary()]
+        surfs = [font.render(line, True, WHITE) for line in lines]
+        width = max(surf.get_width() for surf in surfs) + 16
+        overlay = pygame.Surface((width, sum(surf.get_height() for surf in surfs) + 12), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 190))
+        y = 6
+        for surf in surfs:
+            overlay.blit(surf, (8, y))
+            y += surf.get_height()
+        rect = overlay.get_rect(topright=(WIDTH-20, 10))
+        if perf_rect is not None and rect != perf_rect:
+            mark_dirty(perf_rect)  # it shrank or grew, clear what the last one covered
+        perf_rect = rect
+    return overlay
+
+# ----------------------------
+# Prefetch
+# ----------------------------
+# While the feedback screen is up, the next question is picked and laid out
+# ahead of time, so moving on only swaps it in. It is thrown away if the mode,
+# topic or anything the selector depends on changed since it was picked.
+prefetched = None   # (selector, mode, selector stamp, question, answers, correct answers, (layout key, layout))
+
+def prefetch_question():
+    global prefetched
+    with profiler.span("prefetch"):
+        picked = pick_question()
+        prefetched = (selector, mode, selector.stamp) + picked + (layout_question(picked[0], picked[1]),)
+        for rect, path in prefetched[-1][1][5]:
+            image_loader.prefetch(path, rect.size)  # decoded while the feedback screen is up
+
+def discard_prefetch():
+    global prefetched
+    if prefetched is not None:
+        prefetched[0].cancel(prefetched[3])
+        prefetched = None
+
+def next_question():
+    global question,answers,correct_answers,selected,show_feedback,layout_dirty,prefetched
+    pygame.time.set_timer(NEXT_QUESTION_EVENT, 0)
+    if prefetched is not None and prefetched[:3]==(selector, mode, selector.stamp):
+        question,answers,correct_answers,(key,layout) = prefetched[3:]
+        prefetched = None
+        present_question(question)
+        if key==layout_key() and not layout_dirty:
+            install_layout(layout)
+        else:
+            layout_dirty=True
+    else:
+        discard_prefetch()
+        question,answers,correct_answers = get_random_question()
+        layout_dirty=True
+    selected=None
+    show_feedback=False
+    for q in retired - {question}:
+        QuestionsAnswers.pop(q, None)  # removed from Questions.txt while it was on screen
+        retired.discard(q)
+
+# ----------------------------
+# Startup
+# ----------------------------
+# Only what the first frame needs runs before it; the rest waits until the
+# window shows a question. STARTUP_REPORT (config.json) prints the phases and
+# writes them to STARTUP_REPORT_FILE.
+def finish_startup():
+    global source_watcher
+    present_question(question)  # a journal write and fsync, and a compaction if one is due
+    mark_dirty()  # the first frame showed it as not yet seen
+    startup.phase("record first question")
+    if HOT_RELOAD_INTERVAL and not isinstance(QuestionsAnswers, bank.CompiledBank):
+        from CreateDictionary import SourceWatcher  # only hot reload needs the builder
+        source_watcher = SourceWatcher(SOURCE_FILE, MANIFEST_FILE)
+        pygame.time.set_timer(SOURCE_CHECK_EVENT, int(HOT_RELOAD_INTERVAL*1000))
+        startup.phase("start hot reload")
+    if STARTUP_REPORT:
+        report = startup.report()
+        print(report)
+        with open(STARTUP_REPORT_FILE,"w",encoding="utf-8") as f:
+            f.write(report+"\n")
+
+# ----------------------------
+# Main loop
+# ----------------------------
+if __name__ == "__main__":
+    startup.phase("config")
+    set_questions(load_questions())
+    startup.phase("load questions")
+    init_display()
+    startup.phase("open window")
+    question,answers,correct_answers = pick_question()
+    startup.phase("pick question")
+
+    running=True
+    while running:
+        if layout_dirty:
+            relayout()
+            profiler.lap("layout")
+            if startup.first_frame is None: startup.phase("layout")
+        if dirty_rects:
+            draw_frame()
+            profiler.lap("draw")
+        profiler.end_frame()
+        if startup.first_frame is None:
+            startup.phase("draw")
+            startup.shown()
+            finish_startup()
+            draw_frame()  # now, not after the next event
+        if show_feedback and prefetched is None:
+            prefetch_question()
+
+        # ----------------------------
+        # Event handling
+        # ----------------------------
+        # Block until something happens, then drain whatever else queued up before redrawing
+        events = [pygame.event.wait()] + pygame.event.get()
+        profiler.begin_frame()  # frame time covers the work after waking up, not the wait
+        for event in events:
+            if event.type==pygame.QUIT:
+                answer_journal.compact(QuestionsAnswers, save_questions, wait=True)
+                if profiler.enabled and profiler.events:
+                    print(f"Saved {profiler.export(PERF_EXPORT_FILE)} timings to {PERF_EXPORT_FILE}")
+                config["SCROLL_OFFSET"]=scroll_offset
+                config["DRAG_SCROLLBAR"]=dragging_scroll
+                config["MANUAL_QUESTION_FONT"]=manual_question_font
+                config["MANUAL_ANSWER_FONT"]=manual_answer_font
+                config["MANUAL_UI_FONT"]=manual_ui_font
+                save_config(config)
+                print("Text cache:", text_cache.info())
+                print("Image cache:", image_loader.cache.info())
+                running=False
+                sys.exit()
+            elif event.type==pygame.VIDEORESIZE:
+                WIDTH,HEIGHT = event.w,event.h
+                screen=pygame.display.set_mode((WIDTH,HEIGHT),pygame.RESIZABLE)
+                layout_dirty=True
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                mark_dirty()
+            elif event.type==pygame.KEYDOWN and event.key in (pygame.K_F3, pygame.K_F4):
+                if event.key==pygame.K_F3:
+                    profiler.toggle()
+                    config["PERF_OVERLAY"] = profiler.enabled
+                    mark_dirty()
+                elif profiler.events:
+                    print(f"Saved {profiler.export(PERF_EXPORT_FILE)} timings to {PERF_EXPORT_FILE}")
+            elif event.type==pygame.KEYDOWN:
+                # "/" (or clicking the topic box) types a study topic, Enter applies it, Esc cancels
+                if editing_topic is None:
+                    if event.unicode=="/":
+                        editing_topic = study_topic
+                        mark_dirty(topic_box)
                     continue
+                if event.key==pygame.K_RETURN:
+                    set_topic(editing_topic)
+                    editing_topic = None
+                    config["STUDY_TOPIC"] = study_topic
+                    save_config(config)
+                    next_question()
+                elif event.key==pygame.K_ESCAPE:
+                    editing_topic = None
+                elif event.key==pygame.K_BACKSPACE:
+                    editing_topic = editing_topic[:-1]
+                elif event.unicode and event.unicode.isprintable():
+                    editing_topic += event.unicode
+                mark_dirty(topic_box)
+            elif event.type==IMAGE_READY_EVENT:
+                for key in image_loader.collect():
+                    for rect, path in image_slots:
+                        if (path, rect.size)==key: mark_dirty(rect.move(0,scroll_offset))
+            elif event.type==SOURCE_CHECK_EVENT:
+                if reload_source(): mark_dirty()
+            elif event.type==NEXT_QUESTION_EVENT:
+                if show_feedback and feedback_type=="correct":
+                    next_question()
+            elif event.type==pygame.MOUSEBUTTONDOWN:
+                pos = event.pos
+                if event.button == 1:
+                    clicked_ui = False
 
-                # Question/Answer/UI font buttons
-                for label, rect in question_buttons.items():
-                    if rect.collidepoint(pos):
-                        clicked_ui = True
-                        if label=="Q+": manual_question_font = 24 if manual_question_font is None else manual_question_font+2
-                        elif label=="Q-": manual_question_font = 24 if manual_question_font is None else max(8,manual_question_font-2)
-                        elif label=="QDefault": manual_question_font=None
+                    # Scrollbar dragging
+                    if SHOW_SCROLLBAR and scrollbar_rect and scrollbar_rect.collidepoint(pos):
+                        dragging_scroll = True
+                        config["DRAG_SCROLLBAR"] = True
+                        save_config(config)
+                        continue
 
-                for label, rect in answer_buttons.items():
-                    if rect.collidepoint(pos):
-                        clicked_ui = True
-                        if label=="A+": manual_answer_font = 20 if manual_answer_font is None else manual_answer_font+2
-                        elif label=="A-": manual_answer_font = 20 if manual_answer_font is None else max(8,manual_answer_font-2)
-                        elif label=="ADefault": manual_answer_font=None
+                    # Question/Answer/UI font buttons
+                    for label, rect in question_buttons.items():
+                        if rect.collidepoint(pos):
+                            clicked_ui = True
+                            layout_dirty = True
+                            if label=="Q+": manual_question_font = 24 if manual_question_font is None else manual_question_font+2
+                            elif label=="Q-": manual_question_font = 24 if manual_question_font is None else max(8,manual_question_font-2)
+                            elif label=="QDefault": manual_question_font=None
 
-                for label, rect in ui_buttons.items():
-                    if rect.collidepoint(pos):
-                        clicked_ui = True
-                        if label=="U+": manual_ui_font = 16 if manual_ui_font is None else manual_ui_font+2
-                        elif label=="U-": manual_ui_font = 16 if manual_ui_font is None else max(8,manual_ui_font-2)
-                        elif label=="UDefault": manual_ui_font=None
+                    for label, rect in answer_buttons.items():
+                        if rect.collidepoint(pos):
+                            clicked_ui = True
+                            layout_dirty = True
+                            if label=="A+": manual_answer_font = 20 if manual_answer_font is None else manual_answer_font+2
+                            elif label=="A-": manual_answer_font = 20 if manual_answer_font is None else max(8,manual_answer_font-2)
+                            elif label=="ADefault": manual_answer_font=None
+
+                    for label, rect in ui_buttons.items():
+                        if rect.collidepoint(pos):
+                            clicked_ui = True
+                            layout_dirty = True
+                            if label=="U+": manual_ui_font = 16 if manual_ui_font is None else manual_ui_font+2
+                            elif label=="U-": manual_ui_font = 16 if manual_ui_font is None else max(8,manual_ui_font-2)
+                            elif label=="UDefault": manual_ui_font=None
 
-                for label, rect in buttons_mode.items():
-                    if rect.collidepoint(pos):
+                    for label, rect in buttons_mode.items():
+                        if rect.collidepoint(pos):
+                            clicked_ui = True
+                            mode = label
+                            next_question()
+
+                    if topic_box.collidepoint(pos):
                         clicked_ui = True
-                        mode = label
-                        question, answers, correct_answers = get_random_question()
-                        boxes = create_answer_boxes(answers, WIDTH, HEIGHT, question_height)
-                        selected = None
-
-                # ----------------------
-                # Skip button handled separately
-                # ----------------------
-                if ENABLE_SKIP_BUTTON and skip_button.collidepoint(pos):
-                    question, answers, correct_answers = get_random_question()
-                    boxes = create_answer_boxes(answers, WIDTH, HEIGHT, question_height)
-                    selected = None
-                    show_feedback = False
-                    # Do NOT set clicked_ui=True here; skip button should always respond 
-                # Answer selection
-                if not clicked_ui:
-                    if show_feedback:
-                        show_feedback=False
-                        question,answers,correct_answers=get_random_question()
-                        boxes=create_answer_boxes(answers,WIDTH,HEIGHT,question_height)
-                        selected=None
-                    else:
-                        for rect, ans, ans_font in boxes:
-                            rect_scroll = rect.move(0, scroll_offset)
-                            if rect_scroll.collidepoint(pos):
-                                selected=ans
-                                chosen_answer=ans
-                                if ans in correct_answers:
-                                    feedback_type="correct"
-                                    feedback_start=time.time()
-                                    QuestionsAnswers[question]["stats"]["right"]+=1
-                                else:
-                                    feedback_type="wrong"
-                                    QuestionsAnswers[question]["stats"]["wrong"]+=1
-                                save_questions(QuestionsAnswers)
-                                show_feedback=True
-            elif event.button==4:
-                if total_height_content>HEIGHT: scroll_offset = min(scroll_offset+40,0)
-            elif event.button==5:
-                if total_height_content>HEIGHT: scroll_offset = max(scroll_offset-40, min(0, HEIGHT-total_height_content))
-        elif event.type==pygame.MOUSEBUTTONUP:
-            if event.button==1 and dragging_scroll: dragging_scroll=False; config["DRAG_SCROLLBAR"]=False; save_config(config)
-        elif event.type==pygame.MOUSEMOTION:
-            if dragging_scroll and SHOW_SCROLLBAR and scrollbar_rect:
-                y = event.pos[1]-10
-                scroll_range=total_height_content-HEIGHT
-                bar_max=HEIGHT-scrollbar_rect.height
-                scroll_offset=-int(y*scroll_range/bar_max)
+                        if editing_topic is None: editing_topic = study_topic
+                        mark_dirty(topic_box)
+
+                    # ----------------------
+                    # Skip button handled separately
+                    # ----------------------
+                    if ENABLE_SKIP_BUTTON and skip_button.collidepoint(pos):
+                        next_question()
+                        # Do NOT set clicked_ui=True here; skip button should always respond 
+                    # Answer selection
+                    if not clicked_ui:
+                        if show_feedback:
+                            next_question()
+                        else:
+                            for rect, ans, ans_size in boxes:
+                                rect_scroll = rect.move(0, scroll_offset)
+                                if rect_scroll.collidepoint(pos):
+                                    selected=ans
+                                    chosen_answer=ans
+                                    feedback_type=answer_question(ans)
+                                    if feedback_type=="correct":
+                                        feedback_start=time.time()
+                                        pygame.time.set_timer(NEXT_QUESTION_EVENT, int(NEXT_DELAY*1000), 1)
+                                    show_feedback=True
+                                    mark_dirty()
+                elif event.button==4:
+                    if total_height_content>HEIGHT: scroll_offset = min(scroll_offset+40,0); mark_dirty()
+                elif event.button==5:
+                    if total_height_content>HEIGHT: scroll_offset = max(scroll_offset-40, min(0, HEIGHT-total_height_content)); mark_dirty()
+            elif event.type==pygame.MOUSEBUTTONUP:
+                if event.button==1 and dragging_scroll: dragging_scroll=False; config["DRAG_SCROLLBAR"]=False; save_config(config)
+            elif event.type==pygame.MOUSEMOTION:
+                if dragging_scroll and SHOW_SCROLLBAR and scrollbar_rect:
+                    y = event.pos[1]-10
+                    scroll_range=total_height_content-HEIGHT
+                    bar_max=HEIGHT-scrollbar_rect.height
+                    scroll_offset=-int(y*scroll_range/bar_max)
+                    mark_dirty()
+        profiler.lap("events")
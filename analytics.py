@@ -0,0 +1,179 @@
+import json, math, os
+try:
+    import numpy as np
+except ImportError:   # analytics are optional, everything else runs without NumPy
+    np = None
+import bank
+
+# ----------------------------
+# Learner analytics
+# ----------------------------
+# Batch statistics over every question's right/wrong counts (and the answer
+# history, when there is one), computed on NumPy arrays:
+#   accuracy        right / answered, with a 95% Wilson interval (low, high)
+#   difficulty      Rasch logit: P(right) = 1/(1+exp(difficulty-ability)), with the
+#                   question's accuracy shrunk toward the overall one by PRIOR answers
+#                   so a question answered once doesn't land at +-infinity
+#   difficulty_se   its standard error
+#   discrimination  from the history: correlation between getting the question right
+#                   and how well the learner was doing over the previous WINDOW answers.
+#                   High means the question separates good days from bad ones; near
+#                   zero or negative usually means a badly worded question.
+# miss_chance() is the Practice weight behind PRACTICE_WEIGHTING "confidence":
+# the upper Wilson bound of the error rate, so unseen and barely-seen questions
+# come up often and ones answered right many times fade out.
+
+HISTORY_FILE = "Questions.history"
+PRIOR = 2.0
+Z = 1.96
+WINDOW = 50
+MIN_RESPONSES = 5   # history answers a question needs before it gets a discrimination
+
+def available():
+    return np is not None
+
+def miss_chance(stats):
+    """Upper 95% Wilson bound of the chance of missing a question, from its stats."""
+    wrong = stats.get("wrong", 0)
+    n = stats.get("right", 0) + wrong
+    if n == 0:
+        return 1.0
+    p = wrong / n
+    scale = 1 + Z*Z/n
+    return min(1.0, ((p + Z*Z/(2*n)) + Z*math.sqrt(p*(1-p)/n + Z*Z/(4*n*n))) / scale)
+
+def wilson(k, n):
+    """Vectorized 95% Wilson interval of k successes out of n; (0, 1) where n is 0."""
+    n = np.asarray(n, dtype=np.float64)
+    safe = np.maximum(n, 1)
+    p = k / safe
+    scale = 1 + Z*Z/safe
+    center = (p + Z*Z/(2*safe)) / scale
+    half = Z*np.sqrt(p*(1-p)/safe + Z*Z/(4*safe*safe)) / scale
+    answered = n > 0
+    return np.where(answered, center-half, 0.0), np.where(answered, center+half, 1.0)
+
+def miss_chances(right, wrong):
+    return wilson(wrong, right+wrong)[1]
+
+# ----------------------------
+# Loading
+# ----------------------------
+STATS_DTYPE = None if np is None else np.dtype([("right", "<u4"), ("wrong", "<u4"), ("times_seen", "<u4"), ("reps", "<u4"),
+                                                ("interval", "<f8"), ("ease", "<f8"), ("due", "<f8")])
+
+def load_stats(data, keys=None):
+    """(right, wrong, seen) int arrays for keys (default: all of data, in bank order).
+       A whole compiled bank is read straight from its memory map."""
+    if isinstance(data, bank.CompiledBank) and (keys is None or len(keys) == len(data)):
+        records = np.frombuffer(data.mm, dtype=STATS_DTYPE, count=len(data), offset=data.stats)
+        return (records["right"].astype(np.int64), records["wrong"].astype(np.int64),
+                records["times_seen"].astype(np.int64))
+    keys = list(data) if keys is None else keys
+    rows = [(s.get("right", 0), s.get("wrong", 0), s.get("times_seen", 0)) for s in (data[q]["stats"] for q in keys)]
+    columns = np.array(rows, dtype=np.int64).reshape(len(rows), 3)
+    return columns[:, 0].copy(), columns[:, 1].copy(), columns[:, 2].copy()
+
+class History:
+    """Right/wrong answers appended by the quiz's journal compaction, oldest first, read
+       incrementally: each load() only parses what was appended since the previous one."""
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.offset = 0
+        self.questions, self.correct = [], []
+        self.index, self.positions = None, []
+        self.cached = None   # (index, answers, discrimination)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        if os.path.getsize(self.path) < self.offset:
+            self.__init__(self.path)  # rewritten from scratch
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        chunk = chunk[:chunk.rfind(b"\n")+1]  # the last line may still be being written
+        if not chunk:
+            return self
+        self.offset += len(chunk)
+        text = chunk.decode("utf-8").rstrip("\n")
+        try:
+            rows = json.loads("[" + text.replace("\n", ",") + "]")  # one parse for the whole chunk
+        except ValueError:
+            rows = []
+            for line in text.split("\n"):
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from a crash
+        for _, correct, question in rows:
+            self.correct.append(correct)
+            self.questions.append(question)
+        return self
+
+    def __len__(self):
+        return len(self.questions)
+
+    def arrays(self, index):
+        """(question position, correct) arrays in answer order, for the questions in index
+           ({question: position}). Positions are cached for as long as the same index is passed."""
+        if index is not self.index:
+            self.index, self.positions = index, []
+        self.positions.extend(index.get(q, -1) for q in self.questions[len(self.positions):])
+        pos = np.array(self.positions, dtype=np.int64)
+        correct = np.array(self.correct, dtype=np.float64)
+        known = pos >= 0
+        return pos[known], correct[known]
+
+    def discrimination(self, index):
+        """discrimination() for the questions in index, recomputed only when answers were added."""
+        if self.cached is None or self.cached[0] is not index or self.cached[1] != len(self):
+            self.cached = (index, len(self), discrimination(*self.arrays(index), len(index)))
+        return self.cached[2]
+
+# ----------------------------
+# Analysis
+# ----------------------------
+def discrimination(pos, correct, count):
+    """Per-question correlation between each answer and the learner's accuracy over the
+       WINDOW answers before it. 0 where a question has too few answers or no variation."""
+    result = np.zeros(count)
+    if len(correct) < 2:
+        return result
+    sums = np.concatenate(([0.0], np.cumsum(correct)))
+    idx = np.arange(len(correct))
+    start = np.maximum(idx - WINDOW, 0)
+    width = np.maximum(idx - start, 1)
+    form = (sums[idx] - sums[start]) / width
+    form[0] = correct.mean()
+    n = np.bincount(pos, minlength=count)
+    sx = np.bincount(pos, correct, count)
+    sy = np.bincount(pos, form, count)
+    sxy = np.bincount(pos, correct*form, count)
+    sxx = np.bincount(pos, correct*correct, count)
+    syy = np.bincount(pos, form*form, count)
+    safe = np.maximum(n, 1)
+    cov = sxy/safe - (sx/safe)*(sy/safe)
+    var = (sxx/safe - (sx/safe)**2) * (syy/safe - (sy/safe)**2)
+    ok = (n >= MIN_RESPONSES) & (var > 1e-12)
+    result[ok] = cov[ok] / np.sqrt(var[ok])
+    return result
+
+def analyze(right, wrong, discrimination=None):
+    """Batch statistics for every question, as a dict of arrays (see the top of the file).
+       discrimination comes from History.discrimination, when there is a history."""
+    right = np.asarray(right, dtype=np.float64)
+    wrong = np.asarray(wrong, dtype=np.float64)
+    n = right + wrong
+    overall = (right.sum() + 1) / (n.sum() + 2)
+    ability = math.log(overall / (1 - overall))
+    p = (right + PRIOR*overall) / (n + PRIOR)
+    difficulty = ability - np.log(p / (1 - p))
+    difficulty_se = 1 / np.sqrt((n + PRIOR) * p * (1 - p))
+    low, high = wilson(right, n)
+    result = {"answered": n, "accuracy": np.divide(right, n, out=np.full_like(n, np.nan), where=n > 0),
+              "low": low, "high": high, "difficulty": difficulty, "difficulty_se": difficulty_se,
+              "miss_chance": wilson(wrong, n)[1], "ability": ability}
+    result["discrimination"] = np.zeros(len(n)) if discrimination is None else discrimination
+    return result
+
@@ -0,0 +1,271 @@
+import os, json, mmap, struct, shutil, hashlib, tempfile
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+
+# ----------------------------
+# Compiled question bank
+# ----------------------------
+# A memory-mapped alternative to Questions.json that opens in constant time:
+#
+#   header | hash slots | index | stats records | text
+#
+# hash slots  (question hash, index) sorted by hash, binary searched to find a question
+# index       (text offset, question bytes, total bytes) per question
+# stats       fixed-width right/wrong/times_seen and review schedule, updated in place
+# text        question text followed by its JSON [correct, wrong] answer lists
+#
+# Question and answer text is only decoded when a question is first touched.
+
+MAGIC = b"QBANK\0\0\1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQ")   # magic, version, count, slots, index, stats, text offsets
+SLOT = struct.Struct("<QI4x")
+INDEX = struct.Struct("<QII")
+RECORD = struct.Struct("<IIIIddd")    # right, wrong, times_seen, reps, interval, ease, due
+STATS_FIELDS = {"right": 0, "wrong": 4, "times_seen": 8}
+REVIEW_FIELDS = {"reps": ("<I", 12), "interval": ("<d", 16), "ease": ("<d", 24), "due": ("<d", 32)}
+
+def question_hash(question):
+    return int.from_bytes(hashlib.blake2b(question.encode("utf-8"), digest_size=8).digest(), "little")
+
+def is_current(bank_path, json_path):
+    """True when a compiled bank exists and is not older than the JSON it would replace."""
+    if not os.path.exists(bank_path):
+        return False
+    return not os.path.exists(json_path) or os.path.getmtime(bank_path) >= os.path.getmtime(json_path)
+
+# ----------------------------
+# Views over one stats record
+# ----------------------------
+class StatsView(MutableMapping):
+    __slots__ = ("mm", "pos")
+
+    def __init__(self, mm, pos):
+        self.mm, self.pos = mm, pos
+
+    def __getitem__(self, key):
+        return struct.unpack_from("<I", self.mm, self.pos + STATS_FIELDS[key])[0]
+
+    def __setitem__(self, key, value):
+        struct.pack_into("<I", self.mm, self.pos + STATS_FIELDS[key], value)
+
+    def __delitem__(self, key):
+        raise TypeError("stats fields can't be removed from a compiled bank")
+
+    def __iter__(self):
+        return iter(STATS_FIELDS)
+
+    def __len__(self):
+        return len(STATS_FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class ReviewView(StatsView):
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        fmt, offset = REVIEW_FIELDS[key]
+        return struct.unpack_from(fmt, self.mm, self.pos + offset)[0]
+
+    def __setitem__(self, key, value):
+        fmt, offset = REVIEW_FIELDS[key]
+        struct.pack_into(fmt, self.mm, self.pos + offset, value)
+
+    def __iter__(self):
+        return iter(REVIEW_FIELDS)
+
+    def __len__(self):
+        return len(REVIEW_FIELDS)
+
+class Entry(MutableMapping):
+    """One question, shaped like its Questions.json dict."""
+    __slots__ = ("bank", "i", "answers")
+
+    def __init__(self, bank, i):
+        self.bank, self.i, self.answers = bank, i, None
+
+    def _answers(self):
+        if self.answers is None:
+            self.answers = self.bank._answers_at(self.i)
+        return self.answers
+
+    def _has_review(self):
+        return ReviewView(self.bank.mm, self.bank._record_pos(self.i))["ease"] > 0
+
+    def __getitem__(self, key):
+        if key == "correct": return self._answers()[0]
+        if key == "wrong": return self._answers()[1]
+        if key == "stats": return StatsView(self.bank.mm, self.bank._record_pos(self.i))
+        if key == "review" and self._has_review(): return ReviewView(self.bank.mm, self.bank._record_pos(self.i))
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "stats": view = self["stats"]
+        elif key == "review": view = ReviewView(self.bank.mm, self.bank._record_pos(self.i))
+        else: raise KeyError(f"a compiled bank can't store {key!r}")
+        for field in view:
+            view[field] = value.get(field, 0)
+
+    def __delitem__(self, key):
+        raise TypeError("fields can't be removed from a compiled bank")
+
+    def __iter__(self):
+        yield from ("correct", "wrong", "stats")
+        if self._has_review():
+            yield "review"
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+class KeyList(Sequence):
+    """The bank's questions in file order, decoded on access."""
+    def __init__(self, bank):
+        self.bank = bank
+
+    def __len__(self):
+        return len(self.bank)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.bank.key_at(j) for j in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(i)
+        return self.bank.key_at(i)
+
+# ----------------------------
+# Reading
+# ----------------------------
+class CompiledBank(Mapping):
+    def __init__(self, path, writable=True, private=False):
+        """private maps the file copy-on-write: stats can be changed but never reach the file."""
+        self.path = path
+        self.file = open(path, "r+b" if writable and not private else "rb")
+        access = mmap.ACCESS_COPY if private else mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=access)
+        magic, version, self.count, self.slots, self.index, self.stats, self.text = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} compiled question bank")
+        self.keys_cache = {}
+        self.entries = {}
+
+    def __len__(self):
+        return self.count
+
+    def _record_pos(self, i):
+        return self.stats + i*RECORD.size
+
+    def _span(self, i):
+        offset, qlen, total = INDEX.unpack_from(self.mm, self.index + i*INDEX.size)
+        start = self.text + offset
+        return start, start + qlen, start + total
+
+    def key_at(self, i):
+        key = self.keys_cache.get(i)
+        if key is None:
+            start, split, _ = self._span(i)
+            key = self.keys_cache[i] = self.mm[start:split].decode("utf-8")
+        return key
+
+    def _answers_at(self, i):
+        _, split, end = self._span(i)
+        return json.loads(self.mm[split:end].decode("utf-8"))
+
+    def index_of(self, question):
+        """Position of question in the bank, or -1. Binary search over the hash slots."""
+        target = question_hash(question)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if SLOT.unpack_from(self.mm, self.slots + mid*SLOT.size)[0] < target: lo = mid + 1
+            else: hi = mid
+        while lo < self.count:
+            h, i = SLOT.unpack_from(self.mm, self.slots + lo*SLOT.size)
+            if h != target: break
+            if self.key_at(i) == question: return i
+            lo += 1
+        return -1
+
+    def entry_at(self, i):
+        entry = self.entries.get(i)
+        if entry is None:
+            entry = self.entries[i] = Entry(self, i)
+        return entry
+
+    def __getitem__(self, question):
+        i = self.index_of(question)
+        if i < 0:
+            raise KeyError(question)
+        return self.entry_at(i)
+
+    def __contains__(self, question):
+        return self.index_of(question) >= 0
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.key_at(i)
+
+    def key_list(self):
+        return KeyList(self)
+
+    def to_dict(self):
+        """Plain Questions.json-style dict of the whole bank (export / full load)."""
+        data = {}
+        for i in range(self.count):
+            entry = self.entry_at(i)
+            data[self.key_at(i)] = {k: (dict(v) if isinstance(v, Mapping) else v) for k, v in entry.items()}
+        return data
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+# ----------------------------
+# Writing
+# ----------------------------
+def write_bank(items, path):
+    """Compile (question, entry) pairs into a bank at path, streaming the text to disk.
+       Entries are Questions.json-style dicts; stats and review are optional. Returns the count."""
+    offsets, qlens, totals, hashes = array("Q"), array("I"), array("I"), array("Q")
+    records = bytearray()
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as blob:
+        offset = 0
+        for question, entry in items:
+            qbytes = question.encode("utf-8")
+            abytes = json.dumps([entry.get("correct", []), entry.get("wrong", [])], ensure_ascii=False).encode("utf-8")
+            blob.write(qbytes)
+            blob.write(abytes)
+            offsets.append(offset)
+            qlens.append(len(qbytes))
+            totals.append(len(qbytes) + len(abytes))
+            hashes.append(question_hash(question))
+            offset += len(qbytes) + len(abytes)
+            stats = entry.get("stats") or {}
+            review = entry.get("review") or {}
+            records += RECORD.pack(stats.get("right", 0), stats.get("wrong", 0), stats.get("times_seen", 0),
+                                   review.get("reps", 0), review.get("interval", 0.0), review.get("ease", 0.0),
+                                   review.get("due", 0.0))
+
+        count = len(offsets)
+        slots = HEADER.size
+        index = slots + count*SLOT.size
+        stats = index + count*INDEX.size
+        text = stats + len(records)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, count, slots, index, stats, text))
+            for i in sorted(range(count), key=hashes.__getitem__):
+                f.write(SLOT.pack(hashes[i], i))
+            for i in range(count):
+                f.write(INDEX.pack(offsets[i], qlens[i], totals[i]))
+            f.write(records)
+            blob.seek(0)
+            shutil.copyfileobj(blob, f)
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return count
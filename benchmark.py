@@ -0,0 +1,283 @@
+import os, sys, time, json, random, tempfile, argparse
+
+# ----------------------------
+# Headless benchmark suite
+# ----------------------------
+# Runs the quiz and dashboard logic against generated banks under SDL's dummy
+# video driver and reports latency percentiles, so regressions and scaling limits
+# show up before a release:
+#   python benchmark.py --sizes 1000,10000,100000 --output bench_output.txt
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.chdir(os.path.dirname(os.path.abspath(__file__)))  # Quiz.py reads config.json at import
+
+import pygame
+import journal
+import CreateDictionary
+import neardup
+from bank import CompiledBank, write_bank
+from search import SearchIndex
+import Quiz
+import debugstats
+import analytics
+import images as images_module
+
+WORDS = ("the which of following process is are used to metal surface heat treatment casting forging "
+         "machining welding plastic ceramic glass tool die mold pressure temperature strength hardness "
+         "grain steel aluminum copper alloy cutting speed feed rate finish roughness tolerance part "
+         "________ most common type method material product shape form force energy cost").split()
+
+# ----------------------------
+# Synthetic banks
+# ----------------------------
+def make_bank(size, seed=0):
+    rng = random.Random(seed)
+    def words(lo, hi):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(lo, hi)))
+    bank = {}
+    for i in range(size):
+        answers = [words(1, 8) for _ in range(4)]
+        bank[f"{i}. {words(8, 30)}?"] = {
+            "correct": answers[:1],
+            "wrong": answers[1:],
+            "stats": {"right": rng.randint(0, 5), "wrong": rng.randint(0, 5), "times_seen": rng.randint(0, 10)},
+        }
+    return bank
+
+def bank_to_text(bank):
+    lines = []
+    for question, d in bank.items():
+        lines.append(question)
+        lines += ["    >" + a for a in d["correct"]] + ["    " + a for a in d["wrong"]]
+    return "\n".join(lines) + "\n"
+
+# ----------------------------
+# Measurement helpers
+# ----------------------------
+def timed(fn, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()  # untimed
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered)-1, int(round(p/100*(len(ordered)-1))))]
+
+def summarize(name, size, samples):
+    ordered = sorted(samples)
+    ms = lambda v: round(v*1000, 3)
+    return {"name": name, "size": size, "n": len(samples), "p50": ms(percentile(ordered, 50)),
+            "p95": ms(percentile(ordered, 95)), "p99": ms(percentile(ordered, 99)), "max": ms(ordered[-1])}
+
+# ----------------------------
+# Benchmarks
+# ----------------------------
+def bench_quiz(bank, workdir, repeat):
+    Quiz.JSON_FILE = os.path.join(workdir, "Questions.json")
+    Quiz.answer_journal = journal.Journal(os.path.join(workdir, "Questions.journal"), Quiz.JOURNAL_COMPACT_EVERY)
+    Quiz.set_questions(bank)
+    results = []
+
+    for mode in ("Arcade", "Practice", "Review"):
+        Quiz.mode = mode
+        Quiz.get_random_question()  # builds the Practice sampler / Review queue outside the timing
+        def draw():
+            Quiz.question, _, Quiz.correct_answers = Quiz.get_random_question()
+            Quiz.answer_question(Quiz.correct_answers[0] if random.random() < 0.7 else "")
+        results.append(summarize(f"get_random_question + answer ({mode})", len(bank), timed(draw, repeat)))
+    Quiz.answer_journal.compact(bank, Quiz.save_questions, wait=True)
+
+    Quiz.mode = "Arcade"
+    Quiz.question, Quiz.answers, Quiz.correct_answers = Quiz.get_random_question()
+    Quiz.relayout()
+    def steady_frame():
+        Quiz.mark_dirty()
+        Quiz.draw_frame()
+    def new_question_frame():
+        Quiz.next_question()
+        if Quiz.layout_dirty: Quiz.relayout()
+        Quiz.draw_frame()
+    results.append(summarize("quiz frame (same question)", len(bank), timed(steady_frame, repeat)))
+    results.append(summarize("quiz frame (new question)", len(bank), timed(new_question_frame, repeat)))
+    # What the student waits for after the feedback screen, before drawing, with and without a prefetch
+    def transition():
+        Quiz.next_question()
+        if Quiz.layout_dirty: Quiz.relayout()
+    results.append(summarize("next question", len(bank), timed(transition, repeat)))
+    results.append(summarize("next question (prefetched)", len(bank), timed(transition, repeat, setup=Quiz.prefetch_question)))
+    Quiz.profiler.enabled = True
+    results.append(summarize("quiz frame (perf overlay on)", len(bank), timed(steady_frame, repeat)))
+    Quiz.profiler.enabled = False
+
+    Quiz.answer_journal.compact(bank, Quiz.save_questions, wait=True)  # a background save would race the timed ones
+    results.append(summarize("save_questions", len(bank), timed(lambda: Quiz.save_questions(bank), max(3, repeat//50))))
+    question = next(iter(bank))
+    results.append(summarize("journal record", len(bank), timed(lambda: Quiz.record_event("seen", question), repeat)))
+    Quiz.answer_journal.compact(bank, Quiz.save_questions, wait=True)
+    return results
+
+def bench_parse(bank, workdir):
+    path = os.path.join(workdir, "Questions.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(bank_to_text(bank))
+    samples = timed(lambda: CreateDictionary.parse_questions(path), 3)
+    result = summarize("parse_questions", len(bank), samples)
+    result["questions_per_s"] = round(len(bank)/min(samples))
+    result["mb_per_s"] = round(os.path.getsize(path)/min(samples)/1e6, 1)
+    # Incremental rebuild after editing one question: only that block is parsed again
+    blocks = []
+    for _ in CreateDictionary.build(path, bank, [], [], blocks, {}):
+        pass
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("One more question?\n    >yes\n    no\n")
+    rebuild = summarize("incremental build (1 block changed)", len(bank),
+                        timed(lambda: list(CreateDictionary.build(path, bank, blocks, [], [], {})), 3))
+    items = list(bank.items())
+    near_dups = summarize("near-duplicate scan (MinHash/LSH)", len(bank), timed(lambda: neardup.find_clusters(items), 1))
+    return [result, rebuild, near_dups]
+
+def bench_startup(bank, workdir):
+    json_path = os.path.join(workdir, "Questions.json")
+    bank_path = os.path.join(workdir, "Questions.bank")
+    journal.atomic_write_json(bank, json_path, indent=4, ensure_ascii=False)
+    write_bank(bank.items(), bank_path)
+    def open_json():
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        data[random.choice(list(data))]["correct"]
+    def open_compiled():
+        compiled = CompiledBank(bank_path)
+        keys = compiled.key_list()
+        compiled[keys[random.randrange(len(keys))]]["correct"]
+        compiled.close()
+    return [summarize("open Questions.json + first question", len(bank), timed(open_json, 5)),
+            summarize("open Questions.bank + first question", len(bank), timed(open_compiled, 5))]
+
+def bench_search(bank, repeat):
+    index = None
+    def build():
+        nonlocal index
+        index = SearchIndex(bank)
+    results = [summarize("search index build", len(bank), timed(build, 1))]
+    rng = random.Random(2)
+    query = lambda: index.search(" ".join(rng.sample(WORDS, 2)))
+    results.append(summarize("search query (2 words)", len(bank), timed(query, repeat)))
+    return results
+
+def bench_analytics(bank, repeat):
+    if not analytics.available():
+        return []
+    keys = list(bank)
+    counts = analytics.load_stats(bank, keys)[:2]
+    return [summarize("analytics load stats", len(bank), timed(lambda: analytics.load_stats(bank, keys), max(3, repeat//20))),
+            summarize("analytics analyze", len(bank), timed(lambda: analytics.analyze(*counts), max(3, repeat//5)))]
+
+def bench_images(workdir, repeat):
+    # Questions with a large diagram each: frames must not wait for the decode
+    paths = []
+    for i in range(20):
+        surf = pygame.Surface((3000, 2000))
+        surf.fill((i*12, 80, 160))
+        pygame.draw.circle(surf, (255, 255, 255), (1500, 1000), 300+i*20)
+        paths.append(os.path.join(workdir, f"diagram{i}.png"))
+        pygame.image.save(surf, paths[-1])
+    images = {f"{i}. Which process made this part? [img: {path}]":
+              {"correct": ["casting"], "wrong": ["forging", "machining", "welding"],
+               "stats": {"right": 0, "wrong": 0, "times_seen": 0}} for i, path in enumerate(paths)}
+    Quiz.JSON_FILE = os.path.join(workdir, "Questions.json")
+    Quiz.answer_journal = journal.Journal(os.path.join(workdir, "Questions.journal"), Quiz.JOURNAL_COMPACT_EVERY)
+    Quiz.set_questions(images)
+    Quiz.mode = "Arcade"
+    box = (Quiz.WIDTH-100, Quiz.question_image_height(Quiz.HEIGHT))
+    results = [summarize("image decode + scale (worker)", len(images), timed(lambda: images_module.load_scaled(paths[0], box), 5))]
+    Quiz.image_loader = images_module.ImageLoader(Quiz.IMAGE_CACHE_MB*1024*1024)
+    def new_question_frame():
+        Quiz.next_question()
+        if Quiz.layout_dirty: Quiz.relayout()
+        Quiz.draw_frame()
+    results.append(summarize("quiz frame (new question, image)", len(images),
+                             timed(new_question_frame, repeat, setup=Quiz.image_loader.collect)))
+    Quiz.answer_journal.compact(images, Quiz.save_questions, wait=True)
+    return results
+
+def bench_debugstats(bank, workdir, repeat):
+    debugstats.JSON_FILE = os.path.join(workdir, "Questions.json")
+    debugstats.journal_tail = journal.JournalTail(os.path.join(workdir, "Questions.journal"))
+    debugstats.answer_history = analytics.History(os.path.join(workdir, "Questions.history"))
+    debugstats.screen = pygame.display.set_mode((debugstats.WIDTH, debugstats.HEIGHT))
+    debugstats.font = debugstats.get_font(debugstats.FONT_SIZE)
+    results = []
+    data = {}
+    def load():
+        nonlocal data
+        data = debugstats.load_questions()
+        debugstats.build_layout(data)
+    results.append(summarize("debugstats load + layout", len(bank), timed(load, 1)))
+    rng = random.Random(1)
+    limit = max(1, debugstats.layout_height - debugstats.HEIGHT)
+    def frame():
+        debugstats.draw_stats(data, rng.randrange(limit))
+        pygame.display.flip()
+    results.append(summarize("debugstats frame (jump)", len(bank), timed(frame, repeat)))
+    offset = 0
+    def scroll_frame():
+        nonlocal offset
+        offset = (offset + debugstats.SCROLL_SPEED) % limit
+        debugstats.draw_stats(data, offset)
+        pygame.display.flip()
+    results.append(summarize("debugstats frame (scrolling)", len(bank), timed(scroll_frame, repeat)))
+
+    # Table sorts while the quiz answers: each answer moves one row, only the tiles it crossed are redrawn
+    debugstats.QuestionsAnswers = data
+    keys = list(data)
+    def live_answer():
+        question = rng.choice(keys)
+        data[question]["stats"]["wrong"] += 1
+        debugstats.apply_changes({question})
+        debugstats.draw_stats(data, 0)
+        pygame.display.flip()
+    for sort in ("most wrong", "recently changed"):
+        debugstats.SORT_BY = sort
+        results.append(summarize(f"debugstats table build ({sort})", len(bank), timed(lambda: debugstats.build_layout(data), 1)))
+        results.append(summarize(f"debugstats table answer ({sort})", len(bank), timed(live_answer, repeat)))
+    debugstats.SORT_BY = "bank"
+    return results
+
+def print_table(results):
+    print(f"{'benchmark':44} {'size':>7} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for r in results:
+        extra = f"  {r['questions_per_s']} q/s, {r['mb_per_s']} MB/s" if "questions_per_s" in r else ""
+        print(f"{r['name']:44} {r['size']:>7} {r['n']:>5} {r['p50']:>9} {r['p95']:>9} {r['p99']:>9} {r['max']:>9}{extra}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless performance benchmarks for the quiz and dashboard.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated synthetic bank sizes")
+    parser.add_argument("--repeat", type=int, default=200, help="samples per latency benchmark")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    Quiz.init_display()
+    results = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        bank = make_bank(size)
+        with tempfile.TemporaryDirectory() as workdir:
+            results += bench_parse(bank, workdir)
+            results += bench_startup(bank, workdir)
+            results += bench_quiz(bank, workdir, args.repeat)
+            results += bench_search(bank, args.repeat)
+            results += bench_analytics(bank, args.repeat)
+            results += bench_debugstats(bank, workdir, args.repeat)
+        print_table([r for r in results if r["size"] == size])
+        print()
+    with tempfile.TemporaryDirectory() as workdir:
+        image_results = bench_images(workdir, args.repeat)
+    print_table(image_results)
+    results += image_results
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "pygame": pygame.version.ver, "results": results}, f, indent=4)
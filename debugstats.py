@@ -1,10 +1,18 @@
-import pygame, json, os, time
+import pygame, json, os, time, bisect
+import journal, bank, analytics
+from fonts import get_font
+from lrucache import LRUCache
+from search import SearchIndex
+from sortedlist import SortedList
 
 # ----------------------------
 # Config
 # ----------------------------
 CONFIG_FILE = "debugstats_config.json"
 JSON_FILE = "Questions.json"
+BANK_FILE = "Questions.bank"
+JOURNAL_FILE = "Questions.journal"
+HISTORY_FILE = "Questions.history"
 
 default_config = {
     "WINDOW_WIDTH": 1200,
@@ -14,7 +22,10 @@ default_config = {
     "ROW_PADDING": 10,
     "COLUMN_PADDING": 50,
     "REFRESH_INTERVAL": 1,  # seconds for JSON reload
-    "SCROLL_SPEED": 20
+    "SCROLL_SPEED": 20,
+    "TILE_CACHE_MB": 64,
+    "SORT_BY": "bank",
+    "COLOR_BY_DIFFICULTY": False
 }
 
 # Load or create config
@@ -34,15 +45,23 @@ ROW_PADDING = config.get("ROW_PADDING", 10)
 COLUMN_PADDING = config.get("COLUMN_PADDING", 50)
 REFRESH_INTERVAL = config.get("REFRESH_INTERVAL", 1)
 SCROLL_SPEED = config.get("SCROLL_SPEED", 20)
+TILE_CACHE_MB = config.get("TILE_CACHE_MB", 64)
+SORT_BY = config.get("SORT_BY", "bank")
+COLOR_BY_DIFFICULTY = config.get("COLOR_BY_DIFFICULTY", False)
 
 # ----------------------------
 # Pygame Setup
 # ----------------------------
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Quiz Debug Stats")
-clock = pygame.time.Clock()
-font = pygame.font.SysFont("arial", FONT_SIZE)
+screen = None
+font = None
+
+def init_display():
+    global screen, font
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+    pygame.display.set_caption("Quiz Debug Stats")
+    font = get_font(FONT_SIZE)
+
 BLACK, WHITE, GREY, DARK_GREY = (0,0,0), (255,255,255), (200,200,200), (150,150,150)
 
 # ----------------------------
@@ -55,22 +74,192 @@ drag_start_y = 0
 scroll_start_offset = 0
 last_mod_time = 0
 last_reload_time = 0
+journal_tail = journal.JournalTail(JOURNAL_FILE)
 QuestionsAnswers = {}
 
+# Masonry layout, rebuilt only when the data or window width changes:
+# (y, x, height, question) for every entry, sorted by y, so a frame can bisect
+# straight to the entries that intersect the viewport.
+layout = []
+layout_tops = []
+layout_height = 0
+tallest_entry = 0
+layout_spans = {}   # question -> (top, height) in the layout
+
+# The laid-out canvas is drawn in TILE_HEIGHT strips, each rendered once to an
+# offscreen surface and kept in an LRU capped at TILE_CACHE_MB. Scrolling only
+# blits tiles; a tile is re-rendered when a question in it changes or the
+# layout is rebuilt.
+TILE_HEIGHT = 256
+tile_cache = LRUCache(4096, TILE_CACHE_MB*1024*1024)
+canvas_version = 0   # bumped whenever tiles are dropped, so the main loop knows to redraw
+
+# Search box: "/" or Ctrl+F to type, Enter to keep the filter, Esc to clear it.
+# The index is updated on every reload, retokenizing only changed questions.
+search_index = SearchIndex()
+search_query = ""
+search_editing = False
+
+# Analytics (needs NumPy): S cycles the sort order, D colours entries by difficulty.
+# Recomputed for the whole bank whenever stats change; only the changed questions'
+# counts are read again.
+SORTS = {"bank": None, "hardest": "difficulty", "easiest": "difficulty", "least certain": "difficulty_se",
+         "least discriminating": "discrimination"}
+analysis = None
+analysis_pos = {}
+analysis_counts = None   # (right, wrong) arrays in bank order
+answer_history = analytics.History(HISTORY_FILE)
+
+# Table sorts (no NumPy needed): one fixed-height row per question, in a SortedList
+# of (sort key..., bank position). When a question's stats change only its row
+# moves, O(log N), and only the tiles between its old and new row are redrawn.
+TABLE_SORTS = {
+    "most wrong": lambda q, s: (-wrong_rate(s), -s.get("wrong", 0)),
+    "least seen": lambda q, s: (s.get("times_seen", 0),),
+    "recently changed": lambda q, s: (-changed_at.get(q, 0),),
+}
+table = None        # SortedList while a table sort is on, else None
+table_items = {}    # question -> its item in table
+bank_keys = []
+bank_pos = {}
+changed_at = {}     # question -> number of the poll that last saw its stats change
+change_count = 0
+
 # ----------------------------
 # Helpers
 # ----------------------------
-def load_questions():
-    if os.path.exists(JSON_FILE):
-        with open(JSON_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # Cache wrapped lines
+def read_snapshot():
+    # The dashboard lays out every question anyway, so a compiled bank is read in full
+    if bank.is_current(BANK_FILE, JSON_FILE):
+        compiled = bank.CompiledBank(BANK_FILE, writable=False)
+        data = compiled.to_dict()
+        compiled.close()
+        return data
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_questions(previous=None):
+    if os.path.exists(JSON_FILE) or os.path.exists(BANK_FILE):
+        data = read_snapshot()
+        caught_up = journal_tail.catch_up(data)
+        if previous is None:
+            note_changes(caught_up)  # answers still in the journal are the most recent ones
+        # Cache wrapped lines, reusing the ones from the previous load
         column_width = (WIDTH - COLUMN_PADDING*(COLUMN_COUNT+1)) // COLUMN_COUNT
+        previous = previous or {}
         for q, d in data.items():
-            d['wrapped_lines'] = wrap_text(q, font, column_width)
+            old = previous.get(q)
+            d['wrapped_lines'] = old['wrapped_lines'] if old else wrap_text(q, font, column_width)
         return data
     return {}
 
+def reload_questions():
+    global QuestionsAnswers
+    old = QuestionsAnswers
+    QuestionsAnswers = load_questions(old)
+    changed = search_index.update(QuestionsAnswers)
+    stats_changed = {q for q, d in QuestionsAnswers.items() if q in old and d.get("stats") != old[q].get("stats")}
+    if refresh_analysis():
+        note_changes(stats_changed)
+        return
+    if list(QuestionsAnswers) != list(old) or (changed and search_query):
+        note_changes(stats_changed)
+        build_layout(QuestionsAnswers)
+    else:
+        apply_changes(stats_changed)
+
+def refresh_analysis(changed=None):
+    """Recompute the analytics after the questions in changed (None: any of them) changed.
+       Returns True if that rebuilt the layout."""
+    global analysis, analysis_pos, analysis_counts
+    if not analytics.available():
+        return False
+    if changed is None or analysis_counts is None:
+        analysis_pos = {q: i for i, q in enumerate(QuestionsAnswers)}
+        analysis_counts = analytics.load_stats(QuestionsAnswers)[:2]
+    else:
+        right, wrong = analysis_counts
+        for question in changed:
+            stats = QuestionsAnswers[question]["stats"]
+            i = analysis_pos[question]
+            right[i], wrong[i] = stats.get("right", 0), stats.get("wrong", 0)
+    history = answer_history.load()
+    analysis = analytics.analyze(*analysis_counts, history.discrimination(analysis_pos) if len(history) else None)
+    if SORTS.get(SORT_BY):
+        build_layout(QuestionsAnswers)
+        return True
+    return False
+
+def wrong_rate(stats):
+    answered = stats.get("right", 0) + stats.get("wrong", 0)
+    return stats.get("wrong", 0) / answered if answered else 0.0
+
+def note_changes(changed):
+    global change_count
+    change_count += 1
+    for question in changed:
+        changed_at[question] = change_count
+
+def table_item(question):
+    return TABLE_SORTS[SORT_BY](question, QuestionsAnswers[question].get("stats", {})) + (bank_pos[question],)
+
+def build_table(data):
+    global table, table_items
+    bank_keys[:] = data
+    bank_pos.clear()
+    bank_pos.update((q, i) for i, q in enumerate(bank_keys))
+    questions = search_index.search(search_query) if search_query.strip() else data
+    table_items = {q: table_item(q) for q in questions}
+    table = SortedList(table_items.values())
+
+def update_table(changed):
+    """Move the changed questions to their new rows. Returns the (first, last) rows
+       whose content changed, first > last when none did."""
+    first, last = len(table), -1
+    for question in changed:
+        old = table_items.get(question)
+        if old is None:
+            continue  # filtered out by the search
+        new = table_item(question)
+        rows = [table.index(old)]
+        if new != old:
+            table.remove(old)
+            table.add(new)
+            table_items[question] = new
+            rows.append(table.index(new))
+        first, last = min(first, *rows), max(last, *rows)
+    return first, last
+
+def apply_changes(changed):
+    """Redraw what changed stats affect: their entries or the table rows they moved across."""
+    note_changes(changed)
+    rows = update_table(changed) if table is not None else None
+    if analysis_shown(): clear_tiles()  # shown difficulties depend on every answer
+    elif rows is not None: invalidate_rows(*rows)
+    else: invalidate_questions(changed)
+
+def analysis_shown():
+    return analysis is not None and (COLOR_BY_DIFFICULTY or SORTS.get(SORT_BY) is not None)
+
+def ordered_questions(data):
+    questions = search_index.search(search_query) if search_query.strip() else data
+    metric = SORTS.get(SORT_BY)
+    if metric is None or analysis is None:
+        return questions
+    values = analysis[metric]
+    order = values.argsort(kind="stable")
+    if SORT_BY == "hardest":
+        order = order[::-1]
+    keys = list(data)
+    if questions is data:
+        return [keys[i] for i in order]
+    wanted = set(questions)
+    return [keys[i] for i in order if keys[i] in wanted]
+
+def difficulty_color(difficulty):
+    t = min(1.0, max(0.0, (difficulty + 2) / 4))   # -2 (easy) .. +2 (hard) logits
+    return (int(200*t), int(140*(1-t)), 0)
+
 def wrap_text(text, font, max_width):
     words = text.split(' ')
     lines = []
@@ -86,36 +275,151 @@ def wrap_text(text, font, max_width):
         lines.append(current_line.strip())
     return lines
 
-def draw_stats(data, scroll_offset):
-    screen.fill(WHITE)
-    questions = list(data.keys())
+def search_bar_height():
+    return FONT_SIZE + 12 if search_editing or search_query else 0
 
+def row_height():
+    return FONT_SIZE + 2 + ROW_PADDING//2
+
+def table_top():
+    return ROW_PADDING + search_bar_height()
+
+def build_layout(data):
+    global layout, layout_tops, layout_height, tallest_entry, table
+    if SORT_BY in TABLE_SORTS:
+        build_table(data)
+        layout, layout_tops, tallest_entry = [], [], row_height()
+        layout_height = table_top() + len(table)*row_height() + ROW_PADDING
+        layout_spans.clear()
+        clear_tiles()
+        return
+    table = None
     column_width = (WIDTH - COLUMN_PADDING*(COLUMN_COUNT+1)) // COLUMN_COUNT
     col_x_positions = [COLUMN_PADDING + i*(column_width+COLUMN_PADDING) for i in range(COLUMN_COUNT)]
-    column_heights = [ROW_PADDING for _ in range(COLUMN_COUNT)]
+    column_heights = [ROW_PADDING + search_bar_height() for _ in range(COLUMN_COUNT)]
     line_height = FONT_SIZE + 2
 
-    max_height = 0
+    entries = []
+    for question in ordered_questions(data):
+        d = data[question]
+        col = column_heights.index(min(column_heights))
+        height = (len(d['wrapped_lines'])+1)*line_height
+        entries.append((column_heights[col], col_x_positions[col], height, question))
+        column_heights[col] += height + ROW_PADDING
+    entries.sort(key=lambda e: (e[0], e[1]))
+
+    layout = entries
+    layout_tops = [e[0] for e in entries]
+    layout_height = max(column_heights) if entries else 0
+    tallest_entry = max((e[2] for e in entries), default=0)
+    layout_spans.clear()
+    layout_spans.update((e[3], (e[0], e[2])) for e in entries)
+    clear_tiles()
+
+def clear_tiles():
+    global canvas_version
+    tile_cache.clear()
+    canvas_version += 1
 
+def invalidate_questions(questions):
+    """Drop the tiles showing any of questions."""
+    global canvas_version
+    canvas_version += 1
     for question in questions:
-        col = column_heights.index(min(column_heights))
-        x = col_x_positions[col]
-        y = column_heights[col] - scroll_offset
+        span = layout_spans.get(question)
+        if span is not None:
+            top, height = span
+            for tile in range(top // TILE_HEIGHT, (top + height) // TILE_HEIGHT + 1):
+                tile_cache.discard(tile)
 
-        wrapped_lines = data[question]['wrapped_lines']
+def invalidate_rows(first, last):
+    """Drop the tiles showing table rows first..last."""
+    global canvas_version
+    if first > last:
+        return
+    canvas_version += 1
+    top = (table_top() + first*row_height()) // TILE_HEIGHT
+    bottom = (table_top() + (last+1)*row_height()) // TILE_HEIGHT
+    for tile in [t for t in tile_cache.items if top <= t <= bottom]:
+        tile_cache.discard(tile)
 
-        # Draw question
-        for i, line in enumerate(wrapped_lines):
-            screen.blit(font.render(line, True, BLACK), (x, y + i*line_height))
+def stats_label(i, stats):
+    """The stats line of an entry and its colour."""
+    text = f"R:{stats.get('right',0)} W:{stats.get('wrong',0)} Seen:{stats.get('times_seen',0)}"
+    color = BLACK
+    if i is not None and analysis_shown():
+        difficulty = analysis["difficulty"][i]
+        text += (f" Diff:{difficulty:+.1f}±{analysis['difficulty_se'][i]:.1f}"
+                 f" Acc:{analysis['low'][i]:.0%}-{analysis['high'][i]:.0%}")
+        if analysis["discrimination"][i]:
+            text += f" Disc:{analysis['discrimination'][i]:+.2f}"
+        if COLOR_BY_DIFFICULTY:
+            color = difficulty_color(difficulty)
+    return text, color
+
+def draw_row(surface, data, rank, question, y):
+    """One table row: rank, wrong rate, question text cut to fit, stats."""
+    stats = data[question].get("stats", {})
+    answered = stats.get("right", 0) + stats.get("wrong", 0)
+    text, color = stats_label(analysis_pos.get(question), stats)
+    stats_surf = font.render(text, True, color)
+    x = COLUMN_PADDING
+    surface.blit(font.render(f"{rank+1}.", True, DARK_GREY), (x, y))
+    x += font.size(f"{len(table)}.  ")[0]
+    surface.blit(font.render(f"{wrong_rate(stats):.0%}" if answered else "-", True, BLACK), (x, y))
+    x += font.size("100%  ")[0]
+    question_width = WIDTH - COLUMN_PADDING - stats_surf.get_width() - 20 - x
+    surface.blit(font.render(question, True, BLACK), (x, y), pygame.Rect(0, 0, max(0, question_width), row_height()))
+    surface.blit(stats_surf, (WIDTH - COLUMN_PADDING - stats_surf.get_width(), y))
+
+def draw_entry(surface, data, question, x, y):
+    line_height = FONT_SIZE + 2
+    wrapped_lines = data[question]['wrapped_lines']
+
+    # Draw question
+    for i, line in enumerate(wrapped_lines):
+        surface.blit(font.render(line, True, BLACK), (x, y + i*line_height))
+
+    # Draw stats
+    stat_text, color = stats_label(analysis_pos.get(question), data[question].get("stats", {}))
+    surface.blit(font.render(stat_text, True, color), (x, y + len(wrapped_lines)*line_height + 2))
 
-        # Draw stats
-        stats = data[question].get("stats", {})
-        stat_text = f"R:{stats.get('right',0)} W:{stats.get('wrong',0)} Seen:{stats.get('times_seen',0)}"
-        screen.blit(font.render(stat_text, True, BLACK), (x, y + len(wrapped_lines)*line_height + 2))
+def render_tile(data, tile):
+    surface = pygame.Surface((WIDTH, TILE_HEIGHT)).convert()
+    surface.fill(WHITE)
+    top = tile * TILE_HEIGHT
+    if table is not None:
+        first = max(0, (top - table_top()) // row_height())
+        last = (top + TILE_HEIGHT - table_top()) // row_height() + 1
+        for rank, item in enumerate(table.slice(first, last), first):
+            draw_row(surface, data, rank, bank_keys[item[-1]], table_top() + rank*row_height() - top)
+        return surface
+    # Only entries that start less than one tallest entry above the tile can reach into it
+    first = bisect.bisect_left(layout_tops, top - tallest_entry)
+    last = bisect.bisect_right(layout_tops, top + TILE_HEIGHT)
+    for entry_top, x, height, question in layout[first:last]:
+        if entry_top + height > top:
+            draw_entry(surface, data, question, x, entry_top - top)
+    return surface
 
-        # Update column height
-        column_heights[col] += (len(wrapped_lines)+1)*line_height + ROW_PADDING
-        max_height = max(max_height, column_heights[col])
+def tile_cost(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def draw_stats(data, scroll_offset):
+    max_height = layout_height
+    scroll_offset = int(scroll_offset)
+    for tile in range(scroll_offset // TILE_HEIGHT, (scroll_offset + HEIGHT) // TILE_HEIGHT + 1):
+        surface = tile_cache.get_or_create(tile, lambda: render_tile(data, tile), tile_cost)
+        screen.blit(surface, (0, tile*TILE_HEIGHT - scroll_offset))
+
+    # Draw search box
+    bar_height = search_bar_height()
+    if bar_height:
+        pygame.draw.rect(screen, WHITE if search_editing else GREY, (0, 0, WIDTH, bar_height))
+        pygame.draw.line(screen, DARK_GREY, (0, bar_height-1), (WIDTH, bar_height-1))
+        found = len(table if table is not None else layout) if search_query.strip() else len(data)
+        label = f"Search: {search_query}{'|' if search_editing else ''}  ({found} of {len(data)})"
+        screen.blit(font.render(label, True, BLACK), (COLUMN_PADDING, 6))
 
     # Draw scrollbar
     global scrollbar_rect
@@ -134,59 +438,109 @@ def draw_stats(data, scroll_offset):
 # ----------------------------
 # Main Loop
 # ----------------------------
-QuestionsAnswers = load_questions()
-if os.path.exists(JSON_FILE):
-    last_mod_time = os.path.getmtime(JSON_FILE)
-
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running=False
-        elif event.type == pygame.VIDEORESIZE:
-            WIDTH, HEIGHT = event.w, event.h
-            screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-            # Re-wrap questions
-            for q, d in QuestionsAnswers.items():
-                d['wrapped_lines'] = wrap_text(q, font, (WIDTH - COLUMN_PADDING*(COLUMN_COUNT+1)) // COLUMN_COUNT)
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 4:  # scroll up
-                scroll_offset = max(0, scroll_offset - SCROLL_SPEED)
-            elif event.button == 5:  # scroll down
-                scroll_offset += SCROLL_SPEED
-            elif event.button == 1:  # left click
-                if scrollbar_rect and scrollbar_rect.collidepoint(event.pos):
-                    scrollbar_dragging = True
-                    drag_start_y = event.pos[1]
-                    scroll_start_offset = scroll_offset
-        elif event.type == pygame.MOUSEBUTTONUP:
-            if event.button == 1:
-                scrollbar_dragging = False
-        elif event.type == pygame.MOUSEMOTION:
-            if scrollbar_dragging and scrollbar_rect:
-                bar_max_offset = HEIGHT - scrollbar_rect.height
-                delta_y = event.pos[1] - drag_start_y
-                proportion = delta_y / bar_max_offset
-                max_scroll = max_height - HEIGHT
-                scroll_offset = min(max(max_scroll * proportion + scroll_start_offset, 0), max_scroll)
-
-    # Reload JSON periodically
-    if time.time() - last_reload_time > REFRESH_INTERVAL:
-        if os.path.exists(JSON_FILE):
-            mod_time = os.path.getmtime(JSON_FILE)
-            if mod_time != last_mod_time:
-                QuestionsAnswers = load_questions()
-                last_mod_time = mod_time
-        last_reload_time = time.time()
+def get_mod_time():
+    return tuple(os.path.getmtime(p) if os.path.exists(p) else 0 for p in (JSON_FILE, BANK_FILE))
 
-    # Draw stats
-    max_height = draw_stats(QuestionsAnswers, scroll_offset)
+if __name__ == "__main__":
+    init_display()
+    clock = pygame.time.Clock()
+    QuestionsAnswers = load_questions()
+    search_index.update(QuestionsAnswers)
+    if not refresh_analysis():
+        build_layout(QuestionsAnswers)
+    last_mod_time = get_mod_time()
+    max_height = layout_height
+    drawn_view = None
 
-    # Clamp scroll
-    if max_height > HEIGHT:
-        scroll_offset = min(scroll_offset, max_height - HEIGHT)
-    else:
-        scroll_offset = 0
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running=False
+            elif event.type == pygame.VIDEORESIZE:
+                WIDTH, HEIGHT = event.w, event.h
+                screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+                # Re-wrap questions
+                for q, d in QuestionsAnswers.items():
+                    d['wrapped_lines'] = wrap_text(q, font, (WIDTH - COLUMN_PADDING*(COLUMN_COUNT+1)) // COLUMN_COUNT)
+                build_layout(QuestionsAnswers)
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                drawn_view = None
+            elif event.type == pygame.KEYDOWN:
+                if not search_editing:
+                    if event.unicode == "/" or (event.key == pygame.K_f and event.mod & pygame.KMOD_CTRL):
+                        search_editing = True
+                        build_layout(QuestionsAnswers)
+                    elif event.key == pygame.K_d and not analytics.available():
+                        print("Colouring by difficulty needs NumPy (pip install numpy)")
+                    elif event.key in (pygame.K_s, pygame.K_d):
+                        if event.key == pygame.K_s:
+                            names = (list(SORTS) if analytics.available() else ["bank"]) + list(TABLE_SORTS)
+                            SORT_BY = names[(names.index(SORT_BY) + 1) % len(names)] if SORT_BY in names else "bank"
+                            print(f"Sorted by: {SORT_BY}")
+                            scroll_offset = 0
+                            build_layout(QuestionsAnswers)
+                        else:
+                            COLOR_BY_DIFFICULTY = not COLOR_BY_DIFFICULTY
+                            clear_tiles()
+                    continue
+                if event.key == pygame.K_RETURN:
+                    search_editing = False
+                elif event.key == pygame.K_ESCAPE:
+                    search_editing = False
+                    search_query = ""
+                elif event.key == pygame.K_BACKSPACE:
+                    search_query = search_query[:-1]
+                elif event.unicode and event.unicode.isprintable():
+                    search_query += event.unicode
+                scroll_offset = 0
+                build_layout(QuestionsAnswers)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 4:  # scroll up
+                    scroll_offset = max(0, scroll_offset - SCROLL_SPEED)
+                elif event.button == 5:  # scroll down
+                    scroll_offset += SCROLL_SPEED
+                elif event.button == 1:  # left click
+                    if scrollbar_rect and scrollbar_rect.collidepoint(event.pos):
+                        scrollbar_dragging = True
+                        drag_start_y = event.pos[1]
+                        scroll_start_offset = scroll_offset
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:
+                    scrollbar_dragging = False
+            elif event.type == pygame.MOUSEMOTION:
+                if scrollbar_dragging and scrollbar_rect:
+                    bar_max_offset = HEIGHT - scrollbar_rect.height
+                    delta_y = event.pos[1] - drag_start_y
+                    proportion = delta_y / bar_max_offset
+                    max_scroll = max_height - HEIGHT
+                    scroll_offset = min(max(max_scroll * proportion + scroll_start_offset, 0), max_scroll)
+
+        # Follow the quiz's answer journal, and reload the JSON only when it is rewritten
+        # (journal compaction or a CreateDictionary rebuild)
+        if time.time() - last_reload_time > REFRESH_INTERVAL:
+            mod_time = get_mod_time()
+            changed = journal_tail.poll(QuestionsAnswers)
+            if mod_time != last_mod_time or changed is None:
+                reload_questions()
+                last_mod_time = mod_time
+            elif changed and not refresh_analysis(changed):
+                apply_changes(changed)
+            elif changed:
+                note_changes(changed)
+            last_reload_time = time.time()
+
+        # Clamp scroll
+        if layout_height > HEIGHT:
+            scroll_offset = min(scroll_offset, layout_height - HEIGHT)
+        else:
+            scroll_offset = 0
 
-    pygame.display.flip()
-    clock.tick(60)
\ No newline at end of file
+        # Draw stats, only when something on screen changed: scrolling blits cached tiles,
+        # an idle dashboard draws nothing
+        view = (scroll_offset, search_query, search_editing, WIDTH, HEIGHT, canvas_version)
+        if view != drawn_view:
+            max_height = draw_stats(QuestionsAnswers, scroll_offset)
+            pygame.display.flip()
+            drawn_view = view
+        clock.tick(60)
\ No newline at end of file
@@ -0,0 +1,68 @@
+import json, os
+import pygame
+from perf import profiler
+
+# ----------------------------
+# Font registry
+# ----------------------------
+# pygame.font.SysFont scans every installed font the first time it runs and
+# loads the font file on every call. The registry loads each (family, size, bold)
+# face once, and remembers which file each family resolved to in FONT_CACHE_FILE
+# so later launches open that file directly and never trigger the scan. A family
+# that resolved to pygame's default font is only remembered for the current run,
+# so installing it later is picked up on the next launch.
+
+FONT_CACHE_FILE = "font_cache.json"
+
+class FontRegistry:
+    def __init__(self, cache_file=FONT_CACHE_FILE):
+        self.cache_file = cache_file
+        self.fonts = {}
+        self.paths = {}   # "family|bold" -> [font file or None for pygame's default, fake bold]
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    self.paths = {name: entry for name, entry in json.load(f).items() if entry[0] is not None}
+            except (OSError, ValueError, TypeError, IndexError):
+                self.paths = {}
+
+    def get(self, family, size, bold=False):
+        key = (family, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            with profiler.span("font load"):
+                font = self.fonts[key] = self._load(family, size, bold)
+        return font
+
+    def _load(self, family, size, bold):
+        name = f"{family}|{int(bold)}"
+        if name in self.paths:
+            path, fake_bold = self.paths[name]
+            if path is None or os.path.exists(path):
+                try:
+                    font = pygame.font.Font(path, size)
+                    font.set_bold(fake_bold)
+                    return font
+                except OSError:
+                    pass  # font was uninstalled or replaced, resolve it again
+        resolved = []
+        def constructor(path, size, bold, italic):
+            resolved.append([path, bold])
+            return pygame.sysfont.font_constructor(path, size, bold, italic)
+        font = pygame.font.SysFont(family, size, bold=bold, constructor=constructor)
+        self.paths[name] = resolved[0]
+        if resolved[0][0] is not None:
+            self.save()
+        return font
+
+    def save(self):
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump({name: entry for name, entry in self.paths.items() if entry[0] is not None}, f, indent=4)
+        except OSError:
+            pass  # read-only install: we just rescan next launch
+
+registry = FontRegistry()
+
+def get_font(size, bold=False, family="arial"):
+    return registry.get(family, size, bold)
@@ -0,0 +1,125 @@
+import re, threading
+from collections import deque
+import pygame
+from lrucache import LRUCache
+from perf import profiler
+
+# ----------------------------
+# Question images
+# ----------------------------
+# A question or answer line can show pictures: put [img: path] anywhere in it,
+# with path relative to the folder the quiz runs in (e.g. [img: images/lathe.png]).
+# Files are decoded and scaled on a worker thread, never in the render loop;
+# until one is ready the quiz draws a placeholder the same size, so nothing
+# moves when it arrives. Scaled surfaces are kept in an LRU keyed by
+# (path, box size) and capped by their pixel memory.
+
+IMAGE_REF = re.compile(r"\[img:\s*([^\]]+?)\s*\]", re.I)
+MAX_UPSCALE = 2.0   # small diagrams are enlarged up to this much to fill their box
+MAX_QUEUED = 64     # waiting prefetches beyond this are dropped, oldest first
+
+def split_images(text):
+    """(text without its image references, [image paths])."""
+    if "[" not in text:
+        return text, []
+    paths = IMAGE_REF.findall(text)
+    if not paths:
+        return text, paths
+    return " ".join(IMAGE_REF.sub(" ", text).split()), paths
+
+def load_scaled(path, box):
+    """Decode path and scale it to fit box (width, height), keeping its proportions."""
+    surf = pygame.image.load(path)
+    w, h = surf.get_size()
+    scale = min(box[0]/w, box[1]/h, MAX_UPSCALE)
+    size = (max(1, int(w*scale)), max(1, int(h*scale)))
+    if size != (w, h):
+        smooth = surf.get_bitsize() in (24, 32)
+        surf = (pygame.transform.smoothscale if smooth else pygame.transform.scale)(surf, size)
+    try:
+        surf = surf.convert_alpha()  # the display's pixel format blits several times faster
+    except pygame.error:
+        pass  # no display yet
+    return surf
+
+def surface_bytes(surf):
+    return surf.get_width()*surf.get_height()*surf.get_bytesize() if surf else 0
+
+class ImageLoader:
+    """Scaled image surfaces, decoded on a worker thread. get, prefetch and collect are
+       for the main thread; on_ready is called from the worker when collect has work."""
+    def __init__(self, max_bytes, on_ready=None):
+        self.cache = LRUCache(4096, max_bytes)
+        self.on_ready = on_ready
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+        self.queue = deque()        # (path, box) shown now, for the worker, latest first
+        self.prefetches = deque()   # (path, box) wanted soon, for once queue is empty, oldest first
+        self.pending = set()   # keys queued, being decoded, or waiting in ready
+        self.ready = []        # (key, surface or False) decoded but not collected yet
+        self.thread = None
+        self.warned = set()
+
+    def get(self, path, box):
+        """The scaled surface, False if the file can't be loaded, or None while it is
+           being decoded (it goes to the front of the queue)."""
+        key = (path, tuple(box))
+        surf = self.cache.get(key)
+        if surf is None:
+            self._queue(key, urgent=True)
+        return surf
+
+    def prefetch(self, path, box):
+        key = (path, tuple(box))
+        if key not in self.cache:
+            self._queue(key, urgent=False)
+
+    def _queue(self, key, urgent):
+        with self.lock:
+            if key in self.pending:
+                waiting = self.queue if key in self.queue else self.prefetches if key in self.prefetches else None
+                if urgent and waiting is not None:
+                    waiting.remove(key)
+                    self.queue.appendleft(key)
+                return
+            self.pending.add(key)
+            if urgent:
+                self.queue.appendleft(key)
+            else:
+                self.prefetches.append(key)
+                if len(self.prefetches) > MAX_QUEUED:
+                    self.pending.discard(self.prefetches.popleft())
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._work, name="image loader", daemon=True)
+                self.thread.start()
+            self.wake.notify()
+
+    def _work(self):
+        while True:
+            with self.lock:
+                while not self.queue and not self.prefetches:
+                    self.wake.wait()
+                key = (self.queue or self.prefetches).popleft()
+            try:
+                with profiler.span("image decode"):
+                    surf = load_scaled(*key)
+            except (pygame.error, OSError, ValueError):
+                surf = False
+            with self.lock:
+                notify = not self.ready
+                self.ready.append((key, surf))
+            if notify and self.on_ready is not None:
+                self.on_ready()
+
+    def collect(self):
+        """Move decoded images into the cache. Returns their keys."""
+        with self.lock:
+            ready, self.ready = self.ready, []
+            for key, _ in ready:
+                self.pending.discard(key)
+        for key, surf in ready:
+            self.cache.put(key, surf, surface_bytes(surf))
+            if surf is False and key[0] not in self.warned:
+                self.warned.add(key[0])
+                print(f"⚠️  Can't load image {key[0]}")
+        return [key for key, _ in ready]
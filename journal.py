@@ -0,0 +1,251 @@
+import json, os, threading, time
+
+# ----------------------------
+# Answer journal
+# ----------------------------
+# Every seen/correct/wrong event is appended as one JSON line holding the
+# question's full stats (and review schedule, if any) after the event.
+# Records are absolute values, not deltas, so replaying a record twice is
+# harmless and a crash at any point during compaction leaves a consistent
+# bank on the next start. Each journal file starts with a {"segment": id}
+# line so a reader tailing it can tell when it has been rotated.
+FIELDS = ("stats", "review")
+CORRECT_EVENTS = ("correct", "right")  # the quiz's name, and the one older journals used
+
+def apply(rec, data):
+    """Apply one record to data. Returns the question it changed, or None."""
+    question = rec.get("q")
+    entry = data.get(question) if question is not None else None
+    if entry is None:
+        return None
+    for key in FIELDS:
+        if key in rec:
+            entry[key] = rec[key]
+    return question
+
+def read_records(f):
+    """Yield (record, end offset) for every complete line from a binary file's position."""
+    pos = f.tell()
+    for line in f:
+        if not line.endswith(b"\n"):
+            break  # still being written
+        pos += len(line)
+        try:
+            yield json.loads(line), pos
+        except ValueError:
+            continue  # torn line from a crash
+
+def replay(path, data):
+    """Apply every record in a journal file to data. Returns the event count."""
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    with open(path, "rb") as f:
+        for rec, _ in read_records(f):
+            if "q" in rec:
+                count += 1
+                apply(rec, data)
+    return count
+
+def segment_id(path):
+    try:
+        with open(path, "rb") as f:
+            first = f.readline()
+        return json.loads(first).get("segment")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def append_history(path, history_path):
+    """Append the right/wrong answers in a journal file to history_path as [time, correct, question]
+       lines, for analytics that need answer order rather than totals.
+
+    history_path + ".mark" records where the segment's answers start before they are written,
+    so appending the same segment again after a crash replaces them instead of repeating them."""
+    if not os.path.exists(path):
+        return 0
+    segment = segment_id(path)
+    mark_path = history_path + ".mark"
+    lines = []
+    with open(path, "rb") as f:
+        for rec, _ in read_records(f):
+            event = rec.get("e")
+            if event in CORRECT_EVENTS or event == "wrong":
+                lines.append(json.dumps([rec.get("t", 0), int(event in CORRECT_EVENTS), rec["q"]], ensure_ascii=False) + "\n")
+    if lines:
+        with open(history_path, "ab") as f:
+            start = f.tell()
+            if segment is not None:
+                try:
+                    with open(mark_path, "r", encoding="utf-8") as m:
+                        mark = json.load(m)
+                except (OSError, ValueError):
+                    mark = {}
+                if mark.get("segment") == segment and mark.get("offset", start) < start:
+                    start = mark["offset"]
+                    f.truncate(start)  # this segment was appended before a crash
+                atomic_write_json({"segment": segment, "offset": start}, mark_path)
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+    return len(lines)
+
+def atomic_write_json(data, path, **kwargs):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, **kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def snapshot(data):
+    """A copy of a plain dict bank for saving on another thread while the main loop goes on:
+       the stats and review dicts that grading changes are copied too (answer lists are only
+       ever replaced, never changed in place). A compiled bank is saved by flushing its memory
+       map, so it is returned as is."""
+    if not isinstance(data, dict):
+        return data
+    return {q: {**e, **{k: dict(e[k]) for k in FIELDS if k in e}} for q, e in data.items()}
+
+class Journal:
+    def __init__(self, path, compact_every=200, history=None):
+        """history: file that collects the answers of every compacted segment (None: discard them)."""
+        self.path = path
+        self.history = history
+        self.rotated = path + ".1"
+        self.compact_every = compact_every
+        self.pending = 0
+        self._file = None
+        self._thread = None
+
+    def replay(self, data):
+        # The rotated segment is older than the live one, so it goes first.
+        self.pending = replay(self.rotated, data) + replay(self.path, data)
+        return self.pending
+
+    def record(self, event, question, entry):
+        if self._file is None:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path)==0
+            self._file = open(self.path, "a", encoding="utf-8")
+            if new:
+                self._file.write(json.dumps({"segment": f"{time.time():.6f}-{os.getpid()}"}) + "\n")
+        rec = {"e": event, "q": question, "t": round(time.time(), 3)}
+        for key in FIELDS:
+            if key in entry:
+                rec[key] = dict(entry[key])
+        self._file.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.pending += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def save(self, data, save):
+        """Write a full snapshot with save(data) on a background thread, e.g. after questions
+           were added, once any compaction still saving has finished."""
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = threading.Thread(target=save, args=(snapshot(data),), daemon=True)
+        self._thread.start()
+
+    def maybe_compact(self, data, save):
+        if self.pending >= self.compact_every:
+            self.compact(data, save)
+
+    def compact(self, data, save, wait=False):
+        """Fold the journal into the snapshot written by save(data).
+
+        The live journal is rotated aside on the calling thread, so the snapshot
+        taken here covers every rotated record; the slow save then runs on a
+        background thread unless wait is set (used on quit)."""
+        if self._thread is not None:
+            if self._thread.is_alive() and not wait:
+                return
+            self._thread.join()
+            self._thread = None
+        self.close()
+        if os.path.exists(self.rotated):
+            # A previous compaction never finished; fold everything in right now.
+            save(data)
+            for path in (self.rotated, self.path):
+                if os.path.exists(path):
+                    if self.history: append_history(path, self.history)
+                    os.remove(path)
+            self.pending = 0
+            return
+        if not os.path.exists(self.path):
+            return
+        try:
+            os.replace(self.path, self.rotated)
+        except OSError:
+            return  # another process has the journal open (Windows); retry next time
+        self.pending = 0
+        # Copied so questions answered, added or removed meanwhile can't upset the save
+        copy = snapshot(data)
+
+        def run():
+            save(copy)
+            if self.history: append_history(self.rotated, self.history)
+            os.remove(self.rotated)
+
+        if wait:
+            run()
+        else:
+            self._thread = threading.Thread(target=run, daemon=True)
+            self._thread.start()
+
+class JournalTail:
+    """Follows the journal from another process (debugstats) and applies new
+    records as they arrive, across rotations by Journal.compact."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rotated = path + ".1"
+        self.segment = None
+        self.offset = 0
+
+    def _read(self, path, data, changed):
+        try:
+            with open(path, "rb") as f:
+                f.seek(self.offset)
+                for rec, offset in read_records(f):
+                    self.offset = offset
+                    question = apply(rec, data)
+                    if question is not None:
+                        changed.add(question)
+        except OSError:
+            pass
+
+    def catch_up(self, data):
+        """Replay everything not yet in the snapshot data was loaded from and start following."""
+        changed = set()
+        self.segment = segment_id(self.rotated)
+        self.offset = 0
+        if self.segment is not None:
+            self._read(self.rotated, data, changed)
+        self.segment = segment_id(self.path)
+        self.offset = 0
+        self._read(self.path, data, changed)
+        return changed
+
+    def poll(self, data):
+        """Apply records written since the last poll. Returns the set of changed
+        questions, or None when records were lost to a finished compaction and
+        the caller has to reload the snapshot."""
+        changed = set()
+        segment = segment_id(self.path)
+        if segment == self.segment and segment is not None:
+            self._read(self.path, data, changed)
+            return changed
+        if self.segment is not None:
+            # The file we were following has been rotated aside; finish it first
+            if segment_id(self.rotated) != self.segment:
+                return None
+            self._read(self.rotated, data, changed)
+        self.segment = segment
+        self.offset = 0
+        if segment is not None:
+            self._read(self.path, data, changed)
+        return changed
@@ -0,0 +1,89 @@
+import asyncio, json, os, random, sys, time, argparse, subprocess, tempfile
+
+# ----------------------------
+# Load generator for server.py
+# ----------------------------
+# Simulates a class of students: each one keeps a connection open and loops
+# /next -> /answer for the whole run, picking one of the shown answers at random.
+# Reports throughput and latency percentiles over every request.
+#   python loadtest.py --students 300 --duration 10
+#   python loadtest.py --spawn          start a server on a scratch stats file first
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values)-1, max(0, round(p/100*len(sorted_values)) - 1))
+    return sorted_values[k]
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: quiz\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def student(name, host, port, mode, deadline, latencies, errors):
+    rng = random.Random(name)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, question = await request(reader, writer, "GET", f"/next?user={name}&mode={mode}")
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+                continue
+            answer = rng.choice(question["answers"])
+            start = time.perf_counter()
+            status, result = await request(reader, writer, "POST", "/answer", {"user": name, "answer": answer})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run(host, port, students, duration, mode):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(student(f"student{i:04d}", host, port, mode, deadline, latencies, errors)
+                           for i in range(students)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    ms = [1000*percentile(latencies, p) for p in (50, 95, 99)]
+    print(f"{students} students, {len(latencies)} requests in {elapsed:.1f}s: "
+          f"{len(latencies)/elapsed:,.0f} req/s, p50 {ms[0]:.2f} ms, p95 {ms[1]:.2f} ms, "
+          f"p99 {ms[2]:.2f} ms, max {1000*latencies[-1]:.2f} ms, {len(errors)} errors")
+
+def spawn_server(port):
+    stats = os.path.join(tempfile.mkdtemp(), "students.json")
+    proc = subprocess.Popen([sys.executable, "server.py", "--port", str(port), "--stats", stats],
+                            stdout=subprocess.PIPE, text=True)
+    print(proc.stdout.readline().strip())  # wait for "Serving ..."
+    return proc
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the quiz server with simulated students.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--mode", default="Practice", choices=("Practice", "Arcade", "Review"))
+    parser.add_argument("--spawn", action="store_true", help="start server.py with a scratch stats file")
+    args = parser.parse_args()
+
+    proc = spawn_server(args.port) if args.spawn else None
+    try:
+        asyncio.run(run(args.host, args.port, args.students, args.duration, args.mode))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+# ----------------------------
+# Bounded LRU cache
+# ----------------------------
+
+class LRUCache:
+    """Least-recently-used cache bounded by item count and, optionally, total cost
+    (e.g. bytes of surface memory). Counts hits and misses."""
+
+    def __init__(self, max_items=256, max_cost=None):
+        self.max_items = max_items
+        self.max_cost = max_cost
+        self.items = OrderedDict()
+        self.costs = {}
+        self.cost = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None):
+        if key in self.items:
+            self.hits += 1
+            self.items.move_to_end(key)
+            return self.items[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value, cost=0):
+        if key in self.items:
+            self.discard(key)
+        self.items[key] = value
+        self.costs[key] = cost
+        self.cost += cost
+        while len(self.items) > self.max_items or (self.max_cost is not None and self.cost > self.max_cost and len(self.items) > 1):
+            old, _ = self.items.popitem(last=False)
+            self.cost -= self.costs.pop(old)
+
+    def get_or_create(self, key, create, cost_fn=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = create()
+            self.put(key, value, cost_fn(value) if cost_fn else 0)
+        return value
+
+    def discard(self, key):
+        if key in self.items:
+            del self.items[key]
+            self.cost -= self.costs.pop(key)
+
+    def clear(self):
+        self.items.clear()
+        self.costs.clear()
+        self.cost = 0
+
+    def info(self):
+        total = self.hits + self.misses
+        rate = 100*self.hits/total if total else 0
+        return f"{len(self.items)} items, {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
+
+_MISSING = object()
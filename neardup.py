@@ -0,0 +1,175 @@
+import re, zlib
+from collections import defaultdict
+
+# ----------------------------
+# Near-duplicate questions
+# ----------------------------
+# Finds questions that were scraped twice with slightly different wording or
+# answer order, without comparing every pair:
+#   shingles   word pairs of the question plus each answer as a whole
+#   signature  one-permutation MinHash: every shingle is hashed once into one
+#              of BANDS*ROWS bins, each bin keeps its smallest hash, empty
+#              bins borrow from a filled one (optimal densification)
+#   LSH        questions sharing all ROWS values of any band are candidates
+#   verify     candidates are kept if their exact Jaccard similarity is at
+#              least the threshold, and joined into clusters
+# With 16 bands of 4 rows a pair at 0.7 similarity becomes a candidate ~99% of
+# the time, at 0.5 ~64%, at 0.3 ~12%, so little time goes into verifying.
+
+BANDS = 16
+ROWS = 4
+BINS = BANDS * ROWS
+THRESHOLD = 0.7
+MAX_BUCKET = 64  # members of a bigger LSH bucket are each compared with this many band-mates
+WORD = re.compile(r"\w+")
+# Densification order of each bin: a fixed pseudo-random walk over the other bins, so two
+# questions borrow from the same place. Borrowing from the next bin instead would make
+# the empty bins of short questions collide with each other and flood LSH with candidates.
+BORROW = [[zlib.crc32(f"{b}:{a}".encode()) % BINS for a in range(1, 4*BINS)] + list(range(BINS))
+          for b in range(BINS)]
+
+def shingles(question, entry):
+    words = WORD.findall(question.casefold())
+    grams = {" ".join(words[i:i+2]) for i in range(max(1, len(words)-1))}
+    for answer in entry.get("correct", []) + entry.get("wrong", []):
+        grams.add("a:" + " ".join(WORD.findall(answer.casefold())))
+    return {zlib.crc32(gram.encode("utf-8")) for gram in grams}
+
+def signature(hashes):
+    mins = [None]*BINS
+    for h in hashes:
+        b, v = h % BINS, h // BINS
+        if mins[b] is None or v < mins[b]:
+            mins[b] = v
+    sig = list(mins)
+    for b, v in enumerate(mins):
+        if v is None:
+            for src in BORROW[b]:
+                v = mins[src]
+                if v is not None:
+                    sig[b] = v
+                    break
+    return sig
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)  # the earliest question is the root
+
+def candidate_pairs(members, sig):
+    """(pairs to verify, number of pairs left out) for one LSH bucket. Every member is paired
+       with up to MAX_BUCKET band-mates: all of them in a small bucket. A bigger one, from many
+       questions sharing a band (a stock set of answers, say), is sorted by signature and each
+       member is paired with the MAX_BUCKET after it: look-alikes agree on more bins, so they
+       sort close together, and copies form an unbroken chain however many there are."""
+    n = len(members)
+    if n <= MAX_BUCKET + 1:
+        return ((i, j) for x, i in enumerate(members) for j in members[x+1:]), 0
+    members = sorted(members, key=sig)
+    compared = MAX_BUCKET*(n - MAX_BUCKET) + MAX_BUCKET*(MAX_BUCKET - 1)//2
+    return ((i, j) for x, i in enumerate(members) for j in members[x+1:x+1+MAX_BUCKET]), n*(n - 1)//2 - compared
+
+def find_clusters(items, threshold=THRESHOLD, counts=None):
+    """Group near-duplicate (question, entry) items. Returns clusters of item indices, each
+       sorted with the first occurrence first, and {index: similarity to its closest match}.
+       counts["skipped"] gets the number of candidate pairs in oversized buckets that were
+       not compared, so near-duplicates among them may have been missed."""
+    sets = [shingles(question, entry) for question, entry in items]
+    buckets = [defaultdict(list) for _ in range(BANDS)]
+    for i, hashes in enumerate(sets):
+        if not hashes:
+            continue
+        sig = signature(hashes)
+        for band, start in enumerate(range(0, BINS, ROWS)):
+            buckets[band][tuple(sig[start:start+ROWS])].append(i)
+
+    sigs = {}  # only kept for members of oversized buckets
+
+    def sig(i):
+        if i not in sigs:
+            sigs[i] = signature(sets[i])
+        return sigs[i]
+
+    groups = DisjointSet(len(items))
+    similarity = {}
+    skipped = 0
+    for band in buckets:
+        for members in band.values():
+            if len(members) < 2:
+                continue
+            pairs, left_out = candidate_pairs(members, sig)
+            skipped += left_out
+            for i, j in pairs:
+                if groups.find(i) == groups.find(j):
+                    continue
+                score = jaccard(sets[i], sets[j])
+                if score >= threshold:
+                    groups.union(i, j)
+                    for k in (i, j):
+                        similarity[k] = max(similarity.get(k, 0), score)
+    if counts is not None:
+        counts["skipped"] = skipped
+
+    clusters = defaultdict(list)
+    for i in range(len(items)):
+        clusters[groups.find(i)].append(i)
+    return sorted(c for c in clusters.values() if len(c) > 1), similarity
+
+def answer_key(answer):
+    return " ".join(WORD.findall(answer.casefold()))
+
+def verdicts(entry):
+    verdict = {answer_key(a): False for a in entry.get("wrong", [])}
+    verdict.update((answer_key(a), True) for a in entry.get("correct", []))
+    return verdict
+
+def disagree(entry, other):
+    """True when an answer is correct in one entry and wrong in the other: a look-alike
+       question with the opposite meaning ("top half" / "bottom half"), not a copy."""
+    mine = verdicts(entry)
+    return any(mine.get(k, v) != v for k, v in verdicts(other).items())
+
+def merge_clusters(items, clusters):
+    """Fold each cluster into its first question: answers are unioned and stats added up.
+       Members whose answers disagree with the first question are left alone.
+       Returns the new item list."""
+    dropped = set()
+    merged = {}
+    for cluster in clusters:
+        first = cluster[0]
+        question, entry = items[first]
+        entry = dict(entry, correct=list(entry.get("correct", [])), wrong=list(entry.get("wrong", [])))
+        verdict = verdicts(entry)
+        for i in cluster[1:]:
+            other = items[i][1]
+            if disagree(items[first][1], other):
+                continue
+            for is_correct, answers in ((True, other.get("correct", [])), (False, other.get("wrong", []))):
+                for answer in answers:
+                    k = answer_key(answer)
+                    if k not in verdict:
+                        verdict[k] = is_correct
+                        entry["correct" if is_correct else "wrong"].append(answer)
+            if "stats" in other:
+                stats = dict(entry.get("stats") or {})
+                for field, value in other["stats"].items():
+                    stats[field] = stats.get(field, 0) + value
+                entry["stats"] = stats
+            dropped.add(i)
+        merged[first] = (question, entry)
+    return [merged.get(i, item) for i, item in enumerate(items) if i not in dropped]
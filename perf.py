@@ -0,0 +1,167 @@
+import csv, json, os, sys, threading, time
+from collections import deque
+from contextlib import nullcontext
+
+# ----------------------------
+# Frame profiler
+# ----------------------------
+# Times the phases of the quiz's main loop (lap) and any call wrapped in a
+# span (saves, selection, font loads), on any thread. Keeps the last WINDOW
+# durations of each phase for percentiles and the last MAX_EVENTS spans for
+# export as a Chrome trace (chrome://tracing, ui.perfetto.dev) or CSV.
+# When disabled every call returns straight away, so it can stay in the code.
+
+WINDOW = 600
+MAX_EVENTS = 200000
+_NULL = nullcontext()
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered)-1, int(len(ordered)*p/100))] if ordered else 0.0
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler, self.name = profiler, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter())
+
+class Profiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.events = deque(maxlen=MAX_EVENTS)   # (name, start, end, thread id)
+        self.samples = {}                         # name -> deque of recent durations in seconds
+        self.frame_start = None
+        self.lap_start = None
+
+    def add(self, name, start, end):
+        self.events.append((name, start, end, threading.get_ident()))
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=WINDOW)
+        samples.append(end - start)
+
+    def span(self, name):
+        """with profiler.span("save_questions"): ..."""
+        return _Span(self, name) if self.enabled else _NULL
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = self.lap_start = time.perf_counter()
+
+    def lap(self, name):
+        """Record the time since the previous lap (or the frame start) as phase name."""
+        if self.enabled and self.lap_start is not None:
+            now = time.perf_counter()
+            self.add(name, self.lap_start, now)
+            self.lap_start = now
+
+    def end_frame(self):
+        if self.enabled and self.frame_start is not None:
+            self.add("frame", self.frame_start, time.perf_counter())
+            self.frame_start = self.lap_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_start = self.lap_start = None
+        return self.enabled
+
+    def summary(self):
+        """[(name, count, p50, p95, p99, max)] in ms, the frame first and the rest by p99."""
+        rows = []
+        for name, samples in list(self.samples.items()):
+            ordered = sorted(samples)
+            rows.append((name, len(ordered), *(1000*percentile(ordered, p) for p in (50, 95, 99)), 1000*ordered[-1]))
+        rows.sort(key=lambda row: (row[0] != "frame", -row[4]))
+        return rows
+
+    # ----------------------------
+    # Export
+    # ----------------------------
+    def export(self, path):
+        """Write the recorded spans to path: CSV if it ends in .csv, otherwise a Chrome trace."""
+        events = list(self.events)
+        tmp = path + ".tmp"
+        if path.lower().endswith(".csv"):
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["name", "start_ms", "duration_ms", "thread"])
+                for name, start, end, tid in events:
+                    writer.writerow([name, f"{1000*(start-self.origin):.3f}", f"{1000*(end-start):.3f}", tid])
+        else:
+            pid = os.getpid()
+            trace = [{"name": name, "ph": "X", "ts": 1e6*(start-self.origin), "dur": 1e6*(end-start),
+                      "pid": pid, "tid": tid} for name, start, end, tid in events]
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+        os.replace(tmp, path)
+        return len(events)
+
+# ----------------------------
+# Startup timing
+# ----------------------------
+# Splits the time from launch to the first frame into the phases the quiz
+# marks, then lists the work it put off until after that frame. Time before
+# Python ran (a frozen build's bootloader, the interpreter) is read from the
+# process creation time where the OS gives it.
+
+def process_age():
+    """Seconds since this process was created, or None where that can't be read."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            times = [wintypes.FILETIME() for _ in range(4)]
+            now = wintypes.FILETIME()
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), *map(ctypes.byref, times)):
+                return None
+            kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+            ticks = lambda ft: (ft.dwHighDateTime << 32) | ft.dwLowDateTime   # 100 ns units
+            return (ticks(now) - ticks(times[0])) / 1e7
+        with open("/proc/self/stat", "rb") as f:
+            started = int(f.read().rsplit(b")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+        with open("/proc/uptime", "rb") as f:
+            return float(f.read().split()[0]) - started
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        age = process_age()
+        self.launch = self.start - age if age is not None and age >= 0 else None
+        self.last = self.start
+        self.phases = []          # (name, start, end)
+        self.first_frame = None   # number of phases up to the first frame
+
+    def phase(self, name):
+        """Record the time since the previous phase as name."""
+        now = time.perf_counter()
+        self.phases.append((name, self.last, now))
+        if profiler.enabled:
+            profiler.add("startup: " + name, self.last, now)
+        self.last = now
+
+    def shown(self):
+        """Mark the first frame as on screen; later phases are deferred work."""
+        self.first_frame = len(self.phases)
+
+    def report(self):
+        origin = self.launch if self.launch is not None else self.start
+        shown = self.phases[self.first_frame-1][2] if self.first_frame else self.last
+        lines = [f"Startup: {1000*(shown-origin):.0f} ms to the first frame"]
+        if self.launch is not None:
+            lines.append(f"  {'before Quiz.py':<22}{1000*(self.start-self.launch):>9.1f} ms  (launcher, interpreter)")
+        for i, (name, start, end) in enumerate(self.phases):
+            if i == self.first_frame:
+                lines.append("After the first frame:")
+            lines.append(f"  {name:<22}{1000*(end-start):>9.1f} ms")
+        return "\n".join(lines)
+
+profiler = Profiler()
@@ -1,8 +1,29 @@
 # -*- mode: python ; coding: utf-8 -*-
+# Fast-start build of the quiz: pyinstaller quiz.spec  ->  dist/quiz/quiz.exe
+#
+# One folder rather than one file, and no UPX: a one-file exe unpacks itself to
+# a temp directory on every launch and UPX has every DLL decompressed again,
+# which was most of the start-up time on the lab machines. Copy the whole
+# dist/quiz folder.
+#
+# NumPy and pkg_resources are left out. pygame imports both when they are there
+# (surfarray, pkgdata) and together they cost more than everything else before
+# the first frame; the quiz never uses them (analytics falls back without NumPy).
+#
+# The folder also gets a Questions.bank compiled from Questions.txt with fresh
+# stats, which opens in constant time instead of parsing Questions.json, plus
+# config.json and Questions.txt. Set STARTUP_REPORT in config.json to have the
+# exe write startup_report.txt with the time to the first frame, by phase.
+import os, shutil, subprocess, sys
 
+bank_path = os.path.join(workpath, 'Questions.bank')
+if os.path.exists(bank_path):
+    os.remove(bank_path)  # otherwise its stats would be carried over
+subprocess.run([sys.executable, 'CreateDictionary.py', 'Questions.txt', '--compile', '--full', '-o', bank_path],
+               cwd=SPECPATH, check=True)
 
 a = Analysis(
-    ['quiz.py'],
+    ['Quiz.py'],
     pathex=[],
     binaries=[],
     datas=[],
@@ -10,7 +31,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['numpy', 'pkg_resources', 'setuptools', 'tkinter'],
     noarchive=False,
     optimize=0,
 )
@@ -19,16 +40,13 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='quiz',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +54,16 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='quiz',
+)
+
+# Quiz.py reads and writes these next to quiz.exe
+for name in (bank_path, 'config.json', 'Questions.txt'):
+    shutil.copy2(os.path.join(SPECPATH, name), os.path.join(DISTPATH, 'quiz'))
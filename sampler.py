@@ -0,0 +1,133 @@
+import random
+from itertools import chain
+
+# ----------------------------
+# Weighted sampler
+# ----------------------------
+# Fenwick (binary indexed) tree over per-key weights. Changing one weight and
+# drawing a key are both O(log N), so a draw no longer rescans the whole bank.
+# Float deltas leave the tree's sums slightly off the weights over time, so it is
+# rebuilt from them after as many changes as there are keys (O(1) amortized), and
+# a draw descends against the tree's own total.
+
+class WeightedSampler:
+    def __init__(self, keys, weight_fn, weights=None):
+        """keys: the items to draw from. weight_fn(key) -> non-negative weight.
+           weights: the initial weights if they were computed in one batch, else weight_fn is called per key."""
+        self.keys = list(keys)
+        self.weight_fn = weight_fn
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.weights = [max(0.0, float(w)) for w in weights] if weights is not None else [self._weight(key) for key in self.keys]
+        self.taken = set()
+        self.removed = set()   # slots of removed keys, left in place with weight 0
+        self._build()
+
+    def _weight(self, key):
+        return max(0.0, float(self.weight_fn(key)))
+
+    def _build(self):
+        n = len(self.weights)
+        self.tree = [0.0] + self.weights
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+        self.changes = 0
+
+    def _set(self, i, weight):
+        delta = weight - self.weights[i]
+        if delta == 0:
+            return
+        self.weights[i] = weight
+        self.changes += 1
+        if self.changes >= len(self.weights):
+            self._build()
+            return
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, k):
+        total = 0.0
+        while k > 0:
+            total += self.tree[k]
+            k -= k & -k
+        return total
+
+    def __len__(self):
+        return len(self.keys) - len(self.taken) - len(self.removed)
+
+    def add(self, key):
+        """Append a new key, O(log N)."""
+        i = len(self.keys)
+        weight = self._weight(key)
+        self.keys.append(key)
+        self.index[key] = i
+        self.weights.append(weight)
+        j = i + 1  # its tree node covers (j - lowbit(j), j]
+        self.tree.append(weight + self._prefix(j - 1) - self._prefix(j - (j & -j)))
+        self.changes += 1
+
+    def remove(self, key):
+        """Drop a key for good. Its slot stays behind with weight 0."""
+        i = self.index.pop(key)
+        self._set(i, 0.0)
+        self.taken.discard(i)
+        self.removed.add(i)
+
+    def update(self, key):
+        """Re-read key's weight after its stats changed."""
+        i = self.index.get(key)
+        if i is not None and i not in self.taken:
+            self._set(i, self._weight(key))
+
+    def _nearest(self, i):
+        """Slot i, or when rounding in the tree landed on a slot with weight 0, the closest one
+           below it with weight (above if there is none), or None when no weight is left."""
+        for j in chain(range(i, -1, -1), range(i + 1, len(self.weights))):
+            if self.weights[j] > 0:
+                return j
+        return None
+
+    def sample(self, rng=random):
+        """Draw one key with probability proportional to its weight."""
+        total = self._prefix(len(self.weights))
+        if total > 0:
+            target = (1.0 - rng.random()) * total  # (0, total] so zero weights are never hit
+            pos = 0
+            step = 1 << (len(self.weights).bit_length() - 1)
+            while step:
+                nxt = pos + step
+                if nxt < len(self.tree) and self.tree[nxt] < target:
+                    pos = nxt
+                    target -= self.tree[nxt]
+                step >>= 1
+            i = self._nearest(min(pos, len(self.keys) - 1))
+            if i is not None:
+                return self.keys[i]
+        if len(self) == 0:
+            raise IndexError("sample from an empty sampler")
+        # Every remaining weight is zero: fall back to a uniform draw
+        return rng.choice([k for i, k in enumerate(self.keys) if i not in self.taken and i not in self.removed])
+
+    def take(self, rng=random):
+        """Draw without replacement: the key is excluded until reset()."""
+        key = self.sample(rng)
+        i = self.index[key]
+        self._set(i, 0.0)
+        self.taken.add(i)
+        return key
+
+    def put_back(self, key):
+        """Undo take() for one key."""
+        i = self.index.get(key)
+        if i in self.taken:
+            self.taken.discard(i)
+            self._set(i, self._weight(key))
+
+    def reset(self):
+        """Put every taken key back, starting a new session."""
+        taken, self.taken = self.taken, set()
+        for i in taken:
+            self._set(i, self._weight(self.keys[i]))
@@ -0,0 +1,97 @@
+import heapq, itertools, time
+
+# ----------------------------
+# Spaced repetition (SM-2)
+# ----------------------------
+# Each question may carry a "review" dict next to its "stats":
+#   {"interval": days, "ease": factor, "reps": successful reviews in a row, "due": unix time}
+# Questions without one are new and become due when the queue is built.
+
+DAY = 86400
+RELEARN_DELAY = 10*60   # a missed card comes back in the same session
+CORRECT_QUALITY, WRONG_QUALITY = 4, 1
+
+def sm2(review, quality, now=None):
+    """Return the review dict after answering with an SM-2 quality grade (0-5)."""
+    now = time.time() if now is None else now
+    ease = review.get("ease", 2.5)
+    reps = review.get("reps", 0)
+    interval = review.get("interval", 0)
+    if quality < 3:
+        reps = 0
+        interval = 0
+        due = now + RELEARN_DELAY
+    else:
+        if reps == 0: interval = 1
+        elif reps == 1: interval = 6
+        else: interval = interval * ease
+        reps += 1
+        due = now + interval*DAY
+    ease = max(1.3, ease + 0.1 - (5-quality)*(0.08 + (5-quality)*0.02))
+    return {"interval": round(interval, 4), "ease": round(ease, 4), "reps": reps, "due": round(due, 3)}
+
+class ReviewQueue:
+    """Min-heap of (due, key): the next card is the most overdue one, popped in O(log N).
+
+    Entries are never removed from the middle of the heap. Rescheduling pushes a
+    fresh entry and the old one is dropped when it surfaces, because it no longer
+    matches the due time held in self.due."""
+
+    def __init__(self, data, keys=None, now=None):
+        self.data = data
+        now = time.time() if now is None else now
+        self._seq = itertools.count()
+        self.due = {}
+        self.heap = []
+        for key in (data if keys is None else keys):
+            review = data[key].get("review")
+            due = review["due"] if review else now
+            self.due[key] = due
+            self.heap.append((due, next(self._seq), key))
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.due)
+
+    def _push(self, key, due):
+        self.due[key] = due
+        heapq.heappush(self.heap, (due, next(self._seq), key))
+
+    def _drop_stale(self):
+        while self.heap and self.due.get(self.heap[0][2]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def peek(self):
+        self._drop_stale()
+        return self.heap[0][2] if self.heap else None
+
+    def pop(self):
+        """Check out the most overdue card. It leaves the queue until grade() or requeue()."""
+        self._drop_stale()
+        if not self.heap:
+            raise IndexError("pop from an empty review queue")
+        due, _, key = heapq.heappop(self.heap)
+        del self.due[key]
+        return key
+
+    def grade(self, key, correct, now=None):
+        entry = self.data[key]
+        quality = CORRECT_QUALITY if correct else WRONG_QUALITY
+        entry["review"] = sm2(entry.get("review", {}), quality, now)
+        self._push(key, entry["review"]["due"])
+
+    def add(self, key, now=None):
+        """Start scheduling a question that was added to the bank."""
+        review = self.data[key].get("review")
+        self._push(key, review["due"] if review else (time.time() if now is None else now))
+
+    def remove(self, key):
+        """Stop scheduling key; its heap entry is dropped when it surfaces."""
+        self.due.pop(key, None)
+
+    def requeue(self, key, delay=0, now=None):
+        """Return a checked-out card without grading it, optionally pushed back by delay seconds."""
+        review = self.data[key].get("review")
+        now = time.time() if now is None else now
+        due = review["due"] if review else now
+        self._push(key, max(due, now+delay) if delay else due)
@@ -0,0 +1,96 @@
+import re, bisect
+
+# ----------------------------
+# Full-text search
+# ----------------------------
+# Inverted index from every word of a question and its answers to the
+# questions containing it. Every word of a query has to match, as a prefix,
+# some word of the question or its answers ("cast alum" finds "casting" +
+# "aluminum"). A lookup is a bisect into the sorted vocabulary plus the size of
+# the matching postings, so queries never scan the bank's strings.
+
+TOKEN = re.compile(r"\w+")
+
+def tokens(text):
+    return TOKEN.findall(text.casefold())
+
+def answers_of(entry):
+    return tuple(entry.get("correct", [])), tuple(entry.get("wrong", []))
+
+class SearchIndex:
+    def __init__(self, data=None):
+        self.postings = {}      # word -> set of questions
+        self.forward = {}       # question -> (answers it was indexed with, its words)
+        self.position = {}      # question -> index in the bank, to return results in bank order
+        self.vocabulary = []    # sorted words, rebuilt lazily after new words appear
+        self.vocabulary_stale = False
+        if data is not None:
+            self.update(data)
+
+    def __len__(self):
+        return len(self.forward)
+
+    def add(self, question, entry):
+        answers = answers_of(entry)
+        words = set(tokens(question))
+        for answer in answers[0] + answers[1]:
+            words.update(tokens(answer))
+        self.forward[question] = (answers, words)
+        for word in words:
+            postings = self.postings.get(word)
+            if postings is None:
+                postings = self.postings[word] = set()
+                self.vocabulary_stale = True
+            postings.add(question)
+
+    def remove(self, question):
+        _, words = self.forward.pop(question)
+        for word in words:
+            postings = self.postings[word]
+            postings.discard(question)
+            if not postings:
+                del self.postings[word]
+                self.vocabulary_stale = True
+
+    def update(self, data):
+        """Bring the index in line with data: removed questions are dropped and only new
+           questions or questions whose answers changed are tokenized. Returns that count."""
+        for question in [q for q in self.forward if q not in data]:
+            self.remove(question)
+        changed = 0
+        for question in data:
+            entry = data[question]
+            indexed = self.forward.get(question)
+            if indexed is None or indexed[0] != answers_of(entry):
+                if indexed is not None:
+                    self.remove(question)
+                self.add(question, entry)
+                changed += 1
+        self.position = {q: i for i, q in enumerate(data)}
+        return changed
+
+    def _matching(self, prefix):
+        if self.vocabulary_stale:
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_stale = False
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        if end - start == 1:
+            return self.postings[self.vocabulary[start]]
+        result = set()
+        for word in self.vocabulary[start:end]:
+            result |= self.postings[word]
+        return result
+
+    def search(self, query):
+        """Questions matching every word of query, in bank order. An empty query matches nothing."""
+        words = set(tokens(query))
+        if not words:
+            return []
+        matches = sorted((self._matching(word) for word in words), key=len)
+        result = set(matches[0])
+        for postings in matches[1:]:
+            if not result:
+                break
+            result &= postings
+        return sorted(result, key=self.position.__getitem__)
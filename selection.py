@@ -0,0 +1,142 @@
+import random, time
+from collections.abc import Mapping
+import analytics
+from sampler import WeightedSampler
+from scheduler import ReviewQueue
+
+# ----------------------------
+# Question selection
+# ----------------------------
+# The three study modes over one set of stats:
+#   Arcade    uniform random
+#   Practice  weighted by wrong/right, so missed questions come back more often,
+#             or with weighting="confidence" by analytics.miss_chance
+#   Review    SM-2 spaced repetition, most overdue first
+# data maps each question to a dict holding its "stats" (and "review" once
+# graded). The quiz passes its question bank; the server passes one student's
+# stats. The sampler and queue are built the first time their mode is used.
+# stamp changes whenever something that affects the next pick does, so a
+# question picked ahead of time can be checked for staleness before it is shown.
+# clock gives the Review schedule's "now"; the simulator passes simulated time.
+
+MODES = ("Practice", "Arcade", "Review")
+WEIGHTINGS = ("ratio", "confidence")
+
+def practice_weight(stats):
+    right = stats["right"] if stats["right"]>0 else 1
+    wrong = stats["wrong"] if stats["wrong"]>0 else 1
+    return wrong/right
+
+class Selector:
+    def __init__(self, data, keys, rng=random, no_repeat=False, skip_delay=60, weighting="ratio", clock=time.time):
+        self.data = data
+        self.keys = keys
+        self.rng = rng
+        self.clock = clock
+        self.weighting = weighting
+        self.no_repeat = no_repeat      # Practice: no question again until all were drawn
+        self.skip_delay = skip_delay    # Review: seconds a skipped card is pushed back
+        self.practice_sampler = None
+        self.review_queue = None
+        self.review_pending = None      # card checked out of the review queue but not answered yet
+        self.taken = None               # last Practice pick drawn without replacement
+        self.stamp = 0
+
+    def get_practice_sampler(self):
+        if self.practice_sampler is None:
+            if self.weighting=="confidence":
+                # Batch the initial weights when NumPy is there; updates go through the same formula per question
+                weights = analytics.miss_chances(*analytics.load_stats(self.data, self.keys)[:2]) if analytics.available() else None
+                self.practice_sampler = WeightedSampler(self.keys, lambda q: analytics.miss_chance(self.data[q]["stats"]), weights)
+            else:
+                self.practice_sampler = WeightedSampler(self.keys, lambda q: practice_weight(self.data[q]["stats"]))
+        return self.practice_sampler
+
+    def get_review_queue(self):
+        if self.review_queue is None:
+            self.review_queue = ReviewQueue(self.data, self.keys, self.clock())
+        return self.review_queue
+
+    def pick(self, mode):
+        self.stamp += 1
+        self.taken = None
+        if self.review_pending is not None:
+            # Skipped or left via a mode switch: put it back a little later
+            self.review_queue.requeue(self.review_pending, self.skip_delay, self.clock())
+            self.review_pending = None
+        if mode=="Arcade":
+            return self.rng.choice(self.keys)
+        if mode=="Review":
+            self.review_pending = self.get_review_queue().pop()
+            return self.review_pending
+        sampler = self.get_practice_sampler()
+        if self.no_repeat:
+            if len(sampler)==0: sampler.reset()
+            self.taken = sampler.take(self.rng)
+            return self.taken
+        return sampler.sample(self.rng)
+
+    def grade(self, question, correct):
+        """Reschedule a Review card once it is answered."""
+        if self.review_pending==question:
+            self.review_queue.grade(question, correct, self.clock())
+            self.review_pending = None
+            self.stamp += 1
+
+    def cancel(self, question):
+        """Undo pick() for a question that was never shown: a Review card keeps its due
+           time and a Practice question drawn without replacement can come up again."""
+        if self.review_pending==question:
+            self.review_queue.requeue(question, now=self.clock())
+            self.review_pending = None
+        if self.taken==question:
+            self.practice_sampler.put_back(question)
+            self.taken = None
+        self.stamp += 1
+
+    def add(self, question):
+        """Start picking a question added to data (the caller adds it to keys)."""
+        if self.practice_sampler is not None:
+            self.practice_sampler.add(question)
+        if self.review_queue is not None:
+            self.review_queue.add(question, self.clock())
+        self.stamp += 1
+
+    def remove(self, question):
+        """Stop picking a question (the caller removes it from keys)."""
+        if self.practice_sampler is not None:
+            self.practice_sampler.remove(question)
+        if self.review_queue is not None:
+            self.review_queue.remove(question)
+        if self.review_pending==question:
+            self.review_pending = None
+        if self.taken==question:
+            self.taken = None
+        self.stamp += 1
+
+    def update(self, question):
+        """Keep the Practice weights in step after question's stats changed."""
+        self.stamp += 1
+        if self.practice_sampler is not None:
+            self.practice_sampler.update(question)
+
+# ----------------------------
+# Per-learner stats
+# ----------------------------
+NEW_ENTRY = {"stats": {"right": 0, "wrong": 0, "times_seen": 0}}
+
+class StudentView(Mapping):
+    """One learner's entries shaped like the bank's, for Selector. Questions the learner has
+       never seen share a read-only default until their owner (the server's StatsStore, the
+       simulator) creates theirs."""
+    def __init__(self, entries, keys):
+        self.entries, self.keys = entries, keys
+
+    def __getitem__(self, question):
+        return self.entries.get(question, NEW_ENTRY)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
@@ -0,0 +1,292 @@
+import asyncio, json, os, random, argparse
+from urllib.parse import urlsplit, parse_qs
+import journal, bank
+from selection import Selector, StudentView, MODES, NEW_ENTRY
+
+# ----------------------------
+# Classroom quiz server
+# ----------------------------
+# One asyncio process serves the whole class over HTTP:
+#   GET  /next?user=NAME&mode=Practice|Arcade|Review   -> {"question", "answers", "mode"}
+#   POST /answer  {"user": NAME, "answer": TEXT}        -> {"correct", "correct_answers", "stats"}
+#   GET  /stats?user=NAME                               -> the student's totals
+#   GET  /health
+# The question bank is loaded once, read-only; the shared stats in it are not
+# touched. Every student has their own stats and review schedule, kept in
+# memory and written to STATS_FILE by a background task in batches.
+#   python server.py --port 8765
+
+STATS_FILE = "students.json"
+JSON_FILE = "Questions.json"
+BANK_FILE = "Questions.bank"
+MAX_BODY = 64*1024
+
+def load_bank():
+    """{question: {"correct", "wrong"}} from the compiled bank or Questions.json, stats left out."""
+    if bank.is_current(BANK_FILE, JSON_FILE):
+        compiled = bank.CompiledBank(BANK_FILE, writable=False)
+        data = {q: {"correct": e["correct"], "wrong": e["wrong"]} for q, e in compiled.to_dict().items()}
+        compiled.close()
+        return data
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        return {q: {"correct": e["correct"], "wrong": e["wrong"]} for q, e in json.load(f).items()}
+
+# ----------------------------
+# Per-student stats
+# ----------------------------
+class StatsStore:
+    """user -> {question: {"stats", "review"}}, saved as a snapshot plus an append-only log.
+
+    Handlers only mark (user, question) pairs as changed, which never blocks. flush()
+    writes the current values of everything marked since the last flush as one batch
+    with a single fsync, off the event loop; records hold absolute values like the
+    quiz's journal, so replaying the log over the snapshot is always safe."""
+
+    def __init__(self, path=STATS_FILE, compact_every=20000):
+        self.path = path
+        self.log_path = path + ".log"
+        self.compact_every = compact_every
+        self.users = {}
+        self.changed = {}   # (user, question) -> None, insertion ordered
+        self.logged = 0
+        self.flushing = None   # flush_forever's flush in progress
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.users = json.load(f)
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as f:
+                for rec, _ in journal.read_records(f):
+                    entry = self.entry(rec["u"], rec["q"])
+                    for key in journal.FIELDS:
+                        if key in rec:
+                            entry[key] = rec[key]
+                    self.logged += 1
+
+    def entries(self, user):
+        return self.users.setdefault(user, {})
+
+    def entry(self, user, question):
+        entries = self.entries(user)
+        entry = entries.get(question)
+        if entry is None:
+            entry = entries[question] = {"stats": dict(NEW_ENTRY["stats"])}
+        return entry
+
+    def mark(self, user, question):
+        self.changed[(user, question)] = None
+
+    def _batch(self):
+        lines = []
+        for user, question in self.changed:
+            entry = self.users[user][question]
+            rec = {"u": user, "q": question}
+            for key in journal.FIELDS:
+                if key in entry:
+                    rec[key] = entry[key]
+            lines.append(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.changed = {}
+        return "".join(lines), len(lines)
+
+    def _append(self, text):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self, snapshot, log_size):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if os.path.getsize(self.log_path) == log_size:
+            os.remove(self.log_path)
+        # else records were appended after the snapshot was taken: keep them, replaying
+        # the whole log over the new snapshot is still safe
+
+    async def flush(self):
+        """Write everything changed since the last flush. Only one flush may run at a time."""
+        if not self.changed:
+            return 0
+        loop = asyncio.get_running_loop()
+        text, count = self._batch()   # serialized on the loop, so handlers can't change it mid-write
+        await loop.run_in_executor(None, self._append, text)
+        self.logged += count
+        if self.logged >= self.compact_every:
+            snapshot = json.dumps(self.users, ensure_ascii=False)
+            log_size = os.path.getsize(self.log_path)
+            await loop.run_in_executor(None, self._compact, snapshot, log_size)
+            self.logged = 0
+        return count
+
+    async def flush_forever(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.flushing = asyncio.ensure_future(self.flush())
+            # Shielded: cancelling this loop leaves a flush that is writing to finish, for close()
+            await asyncio.shield(self.flushing)
+
+    async def close(self):
+        """Wait for flush_forever's flush in progress, if any, then write what is left.
+           Cancel flush_forever first."""
+        if self.flushing is not None:
+            await self.flushing
+        await self.flush()
+
+# ----------------------------
+# Quiz logic
+# ----------------------------
+class Session:
+    def __init__(self, entries, keys):
+        self.rng = random.Random()
+        self.selector = Selector(StudentView(entries, keys), keys, self.rng)
+        self.question = None
+
+class QuizServer:
+    def __init__(self, questions, store):
+        self.questions = questions
+        self.keys = list(questions)
+        self.store = store
+        self.sessions = {}
+        self.requests = 0
+
+    def session(self, user):
+        session = self.sessions.get(user)
+        if session is None:
+            session = self.sessions[user] = Session(self.store.entries(user), self.keys)
+        return session
+
+    def next_question(self, user, mode):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        session = self.session(user)
+        question = session.question = session.selector.pick(mode)
+        self.store.entry(user, question)["stats"]["times_seen"] += 1
+        self.store.mark(user, question)
+        session.selector.update(question)
+        data = self.questions[question]
+        answers = data["correct"] + data["wrong"]
+        session.rng.shuffle(answers)
+        return {"question": question, "answers": answers, "mode": mode}
+
+    def answer(self, user, answer):
+        session = self.session(user)
+        question = session.question
+        if question is None:
+            raise LookupError("no question to answer, call /next first")
+        session.question = None
+        correct_answers = self.questions[question]["correct"]
+        correct = answer in correct_answers
+        stats = self.store.entry(user, question)["stats"]
+        stats["right" if correct else "wrong"] += 1
+        session.selector.grade(question, correct)
+        session.selector.update(question)
+        self.store.mark(user, question)
+        return {"correct": correct, "correct_answers": correct_answers, "stats": stats}
+
+    def stats(self, user):
+        entries = self.store.entries(user)
+        totals = {"right": 0, "wrong": 0, "times_seen": 0}
+        for entry in entries.values():
+            for key in totals:
+                totals[key] += entry["stats"][key]
+        return {"user": user, "questions_seen": len(entries), "questions": len(self.keys), **totals}
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+    def route(self, method, target, body):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method == "POST" and body:
+            fields = json.loads(body)
+            if not isinstance(fields, dict):
+                raise ValueError("body must be a JSON object")
+            query.update(fields)
+        for key in ("user", "answer", "mode"):
+            if not isinstance(query.get(key, ""), str):
+                raise ValueError(f"{key} must be a string")
+        user = query.get("user")
+        if url.path == "/health":
+            return 200, {"ok": True, "questions": len(self.keys), "students": len(self.sessions)}
+        if url.path not in ("/next", "/answer", "/stats"):
+            return 404, {"error": "not found"}
+        if not user:
+            return 400, {"error": "user is required"}
+        if url.path == "/next":
+            return 200, self.next_question(user, query.get("mode", "Practice"))
+        if url.path == "/answer":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            return 200, self.answer(user, query.get("answer", ""))
+        return 200, self.stats(user)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": "request too large"}
+                    body = b""
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = self.route(method, target, body)
+                    except (ValueError, TypeError) as e:
+                        status, payload = 400, {"error": str(e)}
+                    except LookupError as e:
+                        status, payload = 409, {"error": str(e)}
+                self.requests += 1
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                             f"Content-Type: application/json; charset=utf-8\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive or status == 413:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client went away or sent something that isn't HTTP
+        finally:
+            writer.close()
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large"}
+
+async def serve(host, port, stats_file=STATS_FILE, flush_interval=1.0):
+    store = StatsStore(stats_file)
+    quiz = QuizServer(load_bank(), store)
+    server = await asyncio.start_server(quiz.handle, host, port)
+    flusher = asyncio.create_task(store.flush_forever(flush_interval))
+    print(f"Serving {len(quiz.keys)} questions on http://{host}:{port} (stats in {stats_file})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        await store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the quiz to a class over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 to accept students from other machines")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stats", default=STATS_FILE, help="where per-student stats are kept")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="seconds between batched stats writes")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.stats, args.flush_interval))
+    except KeyboardInterrupt:
+        pass
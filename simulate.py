@@ -0,0 +1,191 @@
+import csv, json, random, time, argparse
+import numpy as np
+import bank, analytics
+from selection import Selector, StudentView, NEW_ENTRY
+from scheduler import DAY
+
+# ----------------------------
+# Learner simulator
+# ----------------------------
+# Runs thousands of synthetic learners through the quiz's own selection code
+# (selection.Selector, one per learner, with its own stats and review schedule)
+# and reports how much of the bank they remember for the number of answers
+# they gave, per policy:
+#   python simulate.py --learners 1000 --days 14 --per-day 100
+#   python simulate.py --questions 5000 --policies Arcade,Practice --output curves.csv
+# Picking and grading go through Selector one learner at a time; the learners'
+# memories are NumPy arrays updated for all of them at once.
+
+# ----------------------------
+# Learner model
+# ----------------------------
+# Each learner has an ability and each question a difficulty (the Rasch scale of
+# analytics.py, taken from the bank's stats when it has any). Memory of a question
+# follows an exponential forgetting curve:
+#   recall = exp(-(days since last seen) / stability)
+# Seeing a question for the first time, or missing it (the quiz then shows the
+# right answer), sets stability to BASE_STABILITY * exp(ability - difficulty), or
+# keeps LAPSE of the old one if that is more. A recall multiplies stability by
+# 1 + GROWTH*(1 - recall): a question about to be forgotten gains the most, one
+# asked again straight away next to nothing. A question not recalled can still be
+# answered right by guessing among its answers.
+
+BASE_STABILITY = 2.0   # days
+GROWTH = 5.0
+LAPSE = 0.5
+ABILITY_SD = 0.5
+ANSWER_TIME = 20/DAY   # days per answer, so a day's answers form one sitting
+EXAM_DELAY = 7         # days after a checkpoint for the "in a week" retention
+START = 1.7e9          # unix time of day 0, for the Review schedule
+
+POLICIES = {           # name -> (Selector mode, Selector options)
+    "Arcade": ("Arcade", {}),
+    "Practice": ("Practice", {}),
+    "Practice-confidence": ("Practice", {"weighting": "confidence"}),
+    "Practice-norepeat": ("Practice", {"no_repeat": True}),
+    "Review": ("Review", {}),
+}
+
+class Simulation:
+    def __init__(self, keys, difficulty, guess, learners, policy, seed=0):
+        self.keys = keys
+        self.index = {q: i for i, q in enumerate(keys)}
+        self.mode, options = POLICIES[policy]
+        self.rng = np.random.default_rng(seed)   # same seed, same learners under every policy
+        ability = self.rng.normal(0, ABILITY_SD, (learners, 1))
+        self.initial = (BASE_STABILITY*np.exp(ability - difficulty[None, :])).astype(np.float32)
+        self.stability = np.zeros((learners, len(keys)), np.float32)   # 0 until first seen
+        self.last = np.zeros((learners, len(keys)), np.float32)
+        self.guess = guess
+        self.rows = np.arange(learners)
+        self.now = 0.0   # days
+        self.answers = 0
+        self.entries = [{} for _ in range(learners)]
+        clock = lambda: START + self.now*DAY
+        self.selectors = [Selector(StudentView(entries, keys), keys, random.Random(seed*1000003 + i), clock=clock, **options)
+                          for i, entries in enumerate(self.entries)]
+
+    def step(self):
+        """Every learner answers one question."""
+        picks = np.fromiter((self.index[s.pick(self.mode)] for s in self.selectors), np.int64, len(self.selectors))
+        stability = self.stability[self.rows, picks]
+        seen = stability > 0
+        recall = np.where(seen, np.exp(-(self.now - self.last[self.rows, picks])/np.maximum(stability, 1e-6)), 0.0)
+        recalled = self.rng.random(len(picks)) < recall
+        correct = recalled | (self.rng.random(len(picks)) < self.guess[picks])
+        relearned = np.maximum(self.initial[self.rows, picks], stability*LAPSE)
+        self.stability[self.rows, picks] = np.where(recalled, stability*(1 + GROWTH*(1 - recall)), relearned)
+        self.last[self.rows, picks] = self.now
+        for selector, entries, q, ok in zip(self.selectors, self.entries, picks.tolist(), correct.tolist()):
+            question = self.keys[q]
+            entry = entries.get(question)
+            if entry is None:
+                entry = entries[question] = {"stats": dict(NEW_ENTRY["stats"])}
+            stats = entry["stats"]
+            stats["times_seen"] += 1
+            stats["right" if ok else "wrong"] += 1
+            selector.grade(question, ok)
+            selector.update(question)
+        self.answers += len(picks)
+        self.now += ANSWER_TIME
+
+    def study_day(self, day, answers):
+        self.now = float(day)
+        for _ in range(answers):
+            self.step()
+
+    def retention(self, at, chunk=1024):
+        """Mean chance of recalling a question at day at, over every learner and question."""
+        total = 0.0
+        for i in range(0, len(self.stability), chunk):
+            stability, last = self.stability[i:i+chunk], self.last[i:i+chunk]
+            recall = np.exp(-(at - last)/np.maximum(stability, 1e-6))
+            total += float(np.where(stability > 0, recall, 0.0).sum())
+        return total/self.stability.size
+
+    def coverage(self):
+        return float(np.count_nonzero(self.stability))/self.stability.size
+
+# ----------------------------
+# Banks
+# ----------------------------
+def load_bank(path):
+    """(keys, difficulty, guess chance) for a Questions.json or compiled Questions.bank."""
+    if path.endswith(".bank"):
+        compiled = bank.CompiledBank(path, writable=False)
+        data = compiled.to_dict()
+        compiled.close()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    keys = list(data)
+    right, wrong, _ = analytics.load_stats({q: {"stats": data[q].get("stats", {})} for q in keys})
+    if (right + wrong).any():
+        difficulty = analytics.analyze(right, wrong)["difficulty"]
+    else:
+        difficulty = np.random.default_rng(0).normal(0, 1, len(keys))   # never answered: spread them like make_bank
+    guess = np.array([len(data[q]["correct"])/max(1, len(data[q]["correct"]) + len(data[q]["wrong"])) for q in keys])
+    return keys, difficulty, guess
+
+def make_bank(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return [f"{i}. question" for i in range(size)], rng.normal(0, 1, size), np.full(size, 0.25)
+
+# ----------------------------
+# Runs
+# ----------------------------
+def run(policy, keys, difficulty, guess, learners, days, per_day, seed):
+    """[(day, answers per learner, retention, retention in EXAM_DELAY days, coverage)] and answers/s."""
+    sim = Simulation(keys, difficulty, guess, learners, policy, seed)
+    curve = []
+    start = time.perf_counter()
+    for day in range(days):
+        sim.study_day(day, per_day)
+        checkpoint = day + 1   # the next morning
+        curve.append((checkpoint, sim.answers/learners, sim.retention(checkpoint),
+                      sim.retention(checkpoint + EXAM_DELAY), sim.coverage()))
+    return curve, sim.answers/(time.perf_counter() - start)
+
+def print_curve(policy, curve, rate, every):
+    print(f"{policy}  ({rate:,.0f} answers/s)")
+    print(f"{'day':>5} {'answers':>9} {'retention':>10} {'in a week':>10} {'seen':>7}")
+    for i, (day, answers, retention, later, coverage) in enumerate(curve):
+        if i % every == every - 1 or i == len(curve) - 1:
+            print(f"{day:>5} {answers:>9.0f} {retention:>10.1%} {later:>10.1%} {coverage:>7.1%}")
+    print()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare question selection policies on simulated learners.")
+    parser.add_argument("--bank", default="Questions.json", help="Questions.json or Questions.bank to simulate")
+    parser.add_argument("--questions", type=int, help="use a generated bank of this many questions instead")
+    parser.add_argument("--learners", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--per-day", type=int, default=100, help="answers per learner per day")
+    parser.add_argument("--policies", default=",".join(POLICIES), help="comma-separated, from: " + ", ".join(POLICIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write every curve to this CSV file")
+    args = parser.parse_args()
+
+    keys, difficulty, guess = make_bank(args.questions, args.seed) if args.questions else load_bank(args.bank)
+    policies = args.policies.split(",")
+    for policy in policies:
+        if policy not in POLICIES:
+            parser.error(f"unknown policy {policy!r}, choose from {', '.join(POLICIES)}")
+    print(f"{args.learners} learners, {len(keys)} questions, {args.days} days x {args.per_day} answers\n")
+    curves = {}
+    for policy in policies:
+        curve, rate = run(policy, keys, difficulty, guess, args.learners, args.days, args.per_day, args.seed)
+        curves[policy] = curve
+        print_curve(policy, curve, rate, max(1, args.days//10))
+
+    print(f"{'policy':22} {'retention':>10} {'in a week':>10} {'seen':>7}")
+    for policy, curve in sorted(curves.items(), key=lambda item: -item[1][-1][3]):
+        _, _, retention, later, coverage = curve[-1]
+        print(f"{policy:22} {retention:>10.1%} {later:>10.1%} {coverage:>7.1%}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["policy", "day", "answers_per_learner", "retention", "retention_in_a_week", "seen"])
+            for policy, curve in curves.items():
+                for row in curve:
+                    writer.writerow([policy, *row])
@@ -0,0 +1,123 @@
+from bisect import bisect_left, insort
+
+# ----------------------------
+# Blocked sorted list
+# ----------------------------
+# Items kept in order in blocks of LOAD to 2*LOAD, with the largest item of
+# each block in maxes and a Fenwick tree over block sizes. Finding an item is a
+# bisect over maxes then one inside its block; adding or removing one shifts
+# only that block and updates the tree in O(log N). Reading the item at a
+# position (a row of debugstats' table) descends the tree, also O(log N).
+# Items must be unique and comparable, e.g. (sort key..., bank position).
+
+LOAD = 256
+
+class SortedList:
+    def __init__(self, items=()):
+        items = sorted(items)
+        self.blocks = [items[i:i+LOAD] for i in range(0, len(items), LOAD)]
+        self.maxes = [block[-1] for block in self.blocks]
+        self.size = len(items)
+        self._build()
+
+    def _build(self):
+        n = len(self.blocks)
+        self.tree = [0] + [len(block) for block in self.blocks]
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self.tree[parent] += self.tree[i]
+
+    def _change(self, b, delta):
+        b += 1
+        while b < len(self.tree):
+            self.tree[b] += delta
+            b += b & -b
+
+    def _before(self, b):
+        """Number of items in the blocks before block b."""
+        total = 0
+        while b > 0:
+            total += self.tree[b]
+            b -= b & -b
+        return total
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for block in self.blocks:
+            yield from block
+
+    def add(self, item):
+        if not self.blocks:
+            self.blocks, self.maxes, self.size = [[item]], [item], 1
+            self._build()
+            return
+        b = min(bisect_left(self.maxes, item), len(self.blocks) - 1)
+        block = self.blocks[b]
+        insort(block, item)
+        self.maxes[b] = block[-1]
+        self.size += 1
+        if len(block) > 2*LOAD:
+            self.blocks[b:b+1] = [block[:LOAD], block[LOAD:]]
+            self.maxes[b:b+1] = [block[LOAD-1], block[-1]]
+            self._build()
+        else:
+            self._change(b, 1)
+
+    def remove(self, item):
+        b = bisect_left(self.maxes, item)
+        block = self.blocks[b] if b < len(self.blocks) else ()
+        i = bisect_left(block, item)
+        if i == len(block) or block[i] != item:
+            raise ValueError(f"{item!r} not in list")
+        del block[i]
+        self.size -= 1
+        if block:
+            self.maxes[b] = block[-1]
+            self._change(b, -1)
+        else:
+            del self.blocks[b], self.maxes[b]
+            self._build()
+
+    def index(self, item):
+        """Position of item, which must be in the list."""
+        b = bisect_left(self.maxes, item)
+        block = self.blocks[b] if b < len(self.blocks) else ()
+        i = bisect_left(block, item)
+        if i == len(block) or block[i] != item:
+            raise ValueError(f"{item!r} not in list")
+        return self._before(b) + i
+
+    def _locate(self, pos):
+        """(block, offset in it) of position pos."""
+        b = 0
+        step = 1 << (len(self.blocks).bit_length() - 1)
+        while step:
+            nxt = b + step
+            if nxt < len(self.tree) and self.tree[nxt] <= pos:
+                b = nxt
+                pos -= self.tree[nxt]
+            step >>= 1
+        return b, pos
+
+    def __getitem__(self, pos):
+        if pos < 0:
+            pos += self.size
+        if not 0 <= pos < self.size:
+            raise IndexError("sorted list index out of range")
+        b, i = self._locate(pos)
+        return self.blocks[b][i]
+
+    def slice(self, start, stop):
+        """Items at positions start..stop-1, walking blocks instead of one lookup per item."""
+        start, stop = max(0, start), min(stop, self.size)
+        items = []
+        if start >= stop:
+            return items
+        b, i = self._locate(start)
+        while len(items) < stop - start:
+            items.extend(self.blocks[b][i:i + stop - start - len(items)])
+            b, i = b + 1, 0
+        return items
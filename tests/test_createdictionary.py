@@ -0,0 +1,41 @@
+import json, os, subprocess, sys
+import journal
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "CreateDictionary.py")
+SOURCE = """What is the capital of France?
+    >Paris
+    Lyon
+What is the capital of France.
+    >Paris
+    Lyon
+Which metal is liquid at room temperature?
+    >Mercury
+    Iron
+"""
+
+def run(tmp_path, *args):
+    subprocess.run([sys.executable, SCRIPT, "Questions.txt", *args], cwd=tmp_path, check=True, capture_output=True)
+
+def load(tmp_path):
+    """The bank as the quiz would load it: Questions.json with the journal replayed."""
+    with open(tmp_path / "Questions.json", encoding="utf-8") as f:
+        data = json.load(f)
+    journal.Journal(str(tmp_path / "Questions.journal")).replay(data)
+    return data
+
+def test_merged_stats_survive_the_journal(tmp_path):
+    (tmp_path / "Questions.txt").write_text(SOURCE, encoding="utf-8")
+    run(tmp_path)
+    data = load(tmp_path)
+    log = journal.Journal(str(tmp_path / "Questions.journal"))
+    for question, right in (("What is the capital of France?", 2), ("What is the capital of France.", 3)):
+        data[question]["stats"] = {"right": right, "wrong": 1, "times_seen": right + 1}
+        log.record("correct", question, data[question])
+    log.close()
+
+    run(tmp_path, "--merge-near-dups")
+    merged = load(tmp_path)
+    assert list(merged) == ["What is the capital of France?", "Which metal is liquid at room temperature?"]
+    assert merged["What is the capital of France?"]["stats"] == {"right": 5, "wrong": 2, "times_seen": 7}
+    assert not os.path.exists(tmp_path / "Questions.journal")
+    assert len((tmp_path / "Questions.history").read_text(encoding="utf-8").splitlines()) == 2
@@ -0,0 +1,29 @@
+import json
+import pygame
+import fonts
+
+def test_unresolved_family_is_not_remembered(tmp_path, monkeypatch):
+    pygame.font.init()
+    cache = str(tmp_path / "font_cache.json")
+    scans = []
+    def sysfont(family, size, bold=False, italic=False, constructor=None):
+        scans.append(family)
+        return constructor(None, size, bold, italic)   # not installed: pygame's default font
+    monkeypatch.setattr(pygame.font, "SysFont", sysfont)
+
+    registry = fonts.FontRegistry(cache)
+    registry.get("arial", 20)
+    registry.get("arial", 30)
+    assert scans == ["arial"]   # resolved once per run
+    registry.paths["other|0"] = ["/fonts/other.ttf", False]
+    registry.save()
+    with open(cache, encoding="utf-8") as f:
+        assert json.load(f) == {"other|0": ["/fonts/other.ttf", False]}
+
+    fonts.FontRegistry(cache).get("arial", 20)
+    assert scans == ["arial", "arial"]   # resolved again on the next start
+
+def test_old_cache_with_default_font_is_ignored(tmp_path):
+    cache = tmp_path / "font_cache.json"
+    cache.write_text(json.dumps({"arial|0": [None, False], "arial|1": ["/fonts/arialbd.ttf", False]}))
+    assert fonts.FontRegistry(str(cache)).paths == {"arial|1": ["/fonts/arialbd.ttf", False]}
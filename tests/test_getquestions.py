@@ -0,0 +1,40 @@
+import GetQuestions
+
+def write_dump(path):
+    nodes = []
+    for i in range(2000):   # a long run of nodes that are neither text leaves nor cells
+        nodes.append(f'{{"name": "section {i} \\"name\\" x", "role": "section", "children": []}}')
+    nodes.append('{"name": "Question 1", "role": "text leaf", "children": []}')
+    nodes.append('{"name": "What turns?", "role": "text leaf", "children": []}')
+    for i in range(500):
+        nodes.append(f'{{"name": "group {i}", "role": "group", "children": []}}')
+    nodes.append('{"name": "The spindle", "role": "cell", "children": []}')
+    text = "[\n" + ",\n".join(nodes) + "\n]\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return text
+
+def test_iter_nodes_matches_whole_file_and_carries_little(tmp_path, monkeypatch):
+    path = str(tmp_path / "acce.txt")
+    text = write_dump(path)
+    expected = [(m.group(2), m.group(1)) for m in GetQuestions.NODE.finditer(text)]
+    monkeypatch.setattr(GetQuestions, "CHUNK_SIZE", 97)
+    nodes = GetQuestions.iter_nodes(path)
+    found, carried = [], 0
+    for node in nodes:
+        found.append(node)
+        carried = max(carried, len(nodes.gi_frame.f_locals["buffer"]))
+    assert found == expected
+    assert len(expected) == 3
+    assert carried < 97 + 200   # one chunk plus the node cut off at its end
+
+def test_long_node_is_not_carried(tmp_path, monkeypatch):
+    path = str(tmp_path / "acce.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"name": "' + "x"*5000 + '", "role": "section"}, {"name": "A", "role": "cell",')
+    monkeypatch.setattr(GetQuestions, "CHUNK_SIZE", 100)
+    monkeypatch.setattr(GetQuestions, "MAX_NODE", 1000)
+    nodes = GetQuestions.iter_nodes(path)
+    for _ in nodes:
+        assert len(nodes.gi_frame.f_locals["buffer"]) <= 1100
+    assert list(GetQuestions.iter_nodes(path)) == [("cell", '"A"')]
@@ -0,0 +1,31 @@
+from images import ImageLoader, MAX_QUEUED
+
+def idle_loader():
+    loader = ImageLoader(1 << 20)
+    loader.thread = object()   # no worker, so the queues stay as they are filled
+    return loader
+
+def test_prefetch_overflow_drops_oldest():
+    loader = idle_loader()
+    for i in range(MAX_QUEUED + 3):
+        loader.prefetch(f"{i}.png", (100, 100))
+    queued = [path for path, _ in loader.prefetches]
+    assert len(queued) == MAX_QUEUED
+    assert queued[0] == "3.png" and queued[-1] == f"{MAX_QUEUED + 2}.png"
+    assert ("0.png", (100, 100)) not in loader.pending
+    assert (f"{MAX_QUEUED + 2}.png", (100, 100)) in loader.pending
+
+def test_overflow_keeps_shown_images():
+    loader = idle_loader()
+    assert loader.get("shown.png", (50, 50)) is None
+    for i in range(MAX_QUEUED + 1):
+        loader.prefetch(f"{i}.png", (100, 100))
+    assert list(loader.queue) == [("shown.png", (50, 50))]
+
+def test_get_moves_prefetch_to_front():
+    loader = idle_loader()
+    loader.prefetch("a.png", (10, 10))
+    loader.prefetch("b.png", (10, 10))
+    loader.get("b.png", (10, 10))
+    assert list(loader.queue) == [("b.png", (10, 10))]
+    assert list(loader.prefetches) == [("a.png", (10, 10))]
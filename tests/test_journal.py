@@ -0,0 +1,53 @@
+import json, os
+import journal
+
+def make_bank():
+    return {"Q1": {"correct": ["a"], "wrong": ["b"], "stats": {"right": 0, "wrong": 0, "times_seen": 0}},
+            "Q2": {"correct": ["c"], "wrong": ["d"], "stats": {"right": 0, "wrong": 0, "times_seen": 0}}}
+
+def test_snapshot_does_not_share_stats():
+    data = make_bank()
+    copy = journal.snapshot(data)
+    data["Q1"]["stats"]["right"] += 1
+    data["Q1"]["review"] = {"reps": 1}
+    assert copy["Q1"]["stats"]["right"] == 0
+    assert "review" not in copy["Q1"]
+    assert copy["Q1"]["correct"] == ["a"]
+
+def test_compact_saves_the_values_at_compaction(tmp_path):
+    data = make_bank()
+    log = journal.Journal(str(tmp_path / "Questions.journal"))
+    log.record("correct", "Q1", data["Q1"])
+    saved = []
+    log.compact(data, saved.append)
+    log._thread.join()
+    data["Q1"]["stats"]["right"] = 5   # graded after the snapshot was taken
+    assert saved[0]["Q1"]["stats"]["right"] == 0
+
+def read_history(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_history_not_repeated_after_crash(tmp_path):
+    path = str(tmp_path / "Questions.journal")
+    history = str(tmp_path / "Questions.history")
+    data = make_bank()
+    log = journal.Journal(path, history=history)
+    for event in ("correct", "wrong", "right"):  # "right" as in older journals
+        log.record(event, "Q1", data["Q1"])
+    log.compact(data, lambda snapshot: None, wait=True)
+    assert len(read_history(history)) == 3
+
+    # The next segment is rotated and appended to the history, then the quiz dies
+    # before the rotated file is removed
+    log.record("wrong", "Q2", data["Q2"])
+    log.close()
+    os.replace(path, log.rotated)
+    journal.append_history(log.rotated, history)
+    assert len(read_history(history)) == 4
+
+    restarted = journal.Journal(path, history=history)
+    restarted.replay(data)
+    restarted.compact(data, lambda snapshot: None, wait=True)
+    assert [row[1:] for row in read_history(history)] == [[1, "Q1"], [0, "Q1"], [1, "Q1"], [0, "Q2"]]
+    assert not os.path.exists(log.rotated)
@@ -0,0 +1,51 @@
+import neardup
+
+ANSWERS = {"correct": ["Paris"], "wrong": ["Lyon", "Nice", "Lille"]}
+
+def test_oversized_bucket_is_not_truncated():
+    # Copies differing only in punctuation have identical shingles, so every band puts
+    # all of them in one bucket, bigger than MAX_BUCKET
+    count = neardup.MAX_BUCKET*3
+    items = [("What is the capital of France" + "?!."[i % 3]*(1 + i//3), ANSWERS) for i in range(count)]
+    clusters, similarity = neardup.find_clusters(items)
+    assert clusters == [list(range(count))]
+    assert len(similarity) == count
+
+def test_big_bucket_still_finds_pairs():
+    # Many questions with the same stock answers share bands with each other
+    stock = {"correct": ["True"], "wrong": ["False"]}
+    items = [(f"Statement number {i} about the lathe", stock) for i in range(neardup.MAX_BUCKET*4)]
+    items += [("The milling cutter turns clockwise seen from the spindle?", stock),
+              ("The milling cutter turns clockwise seen from the spindle.", stock)]
+    clusters, _ = neardup.find_clusters(items)
+    assert [len(items) - 2, len(items) - 1] in clusters
+
+def crafted_items(monkeypatch, fillers):
+    """Items whose shingle hashes are given directly: every item has the same minimum in the
+       four bins of band 0 and its own minimum in every other bin, so they share band 0 only."""
+    bins = neardup.BINS
+    common = {b + bins*1 for b in range(neardup.ROWS)}           # band 0's minimums
+    shared = {b + bins*(10**6 + k) for b in range(bins) for k in range(5)}   # large, for the pair
+    sets = {}
+    for i in range(fillers):
+        sets[f"filler {i}"] = common | {b + bins*(1000 + 1000*i + b) for b in range(neardup.ROWS, bins)}
+    for name, base in (("pair a", 500), ("pair b", 600)):
+        sets[name] = common | shared | {b + bins*(base + b) for b in range(neardup.ROWS, bins)}
+    monkeypatch.setattr(neardup, "shingles", lambda question, entry: sets[question])
+    return [(name, {}) for name in sets]
+
+def test_pair_sharing_only_a_crowded_band_is_found(monkeypatch):
+    items = crafted_items(monkeypatch, neardup.MAX_BUCKET*3)
+    a, b = len(items) - 2, len(items) - 1
+    assert neardup.jaccard(neardup.shingles("pair a", {}), neardup.shingles("pair b", {})) >= neardup.THRESHOLD
+    sigs = [neardup.signature(neardup.shingles(q, {})) for q, _ in items[a:]]
+    assert [sigs[0][i:i+4] == sigs[1][i:i+4] for i in range(0, neardup.BINS, 4)].count(True) == 1
+    counts = {}
+    clusters, _ = neardup.find_clusters(items, counts=counts)
+    assert clusters == [[a, b]]
+    assert counts["skipped"] > 0   # the fillers' bucket is too big to compare in full
+
+def test_small_buckets_skip_nothing():
+    counts = {}
+    neardup.find_clusters([(f"question {i} about lathes", ANSWERS) for i in range(50)], counts=counts)
+    assert counts["skipped"] == 0
@@ -0,0 +1,21 @@
+import json, os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import journal
+import Quiz
+
+def test_answers_reach_history_with_the_quiz_event_names(tmp_path, monkeypatch):
+    bank = {f"Q{i}": {"correct": ["yes"], "wrong": ["no"], "stats": {"right": 0, "wrong": 0, "times_seen": 0}}
+            for i in range(3)}
+    history = str(tmp_path / "Questions.history")
+    monkeypatch.setattr(Quiz, "JSON_FILE", str(tmp_path / "Questions.json"))
+    monkeypatch.setattr(Quiz, "answer_journal", journal.Journal(str(tmp_path / "Questions.journal"), history=history))
+    Quiz.set_questions(bank)
+    for ans in ("yes", "no", "yes", "yes", "no"):
+        Quiz.question, _, Quiz.correct_answers = Quiz.get_random_question()
+        Quiz.answer_question(ans)
+    Quiz.answer_journal.compact(bank, Quiz.save_questions, wait=True)
+    with open(history, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [correct for _, correct, _ in rows] == [1, 0, 1, 1, 0]
+    assert sum(entry["stats"]["right"] for entry in bank.values()) == 3
@@ -0,0 +1,40 @@
+import random
+from sampler import WeightedSampler
+
+class Top:
+    """An rng whose draws land at the very end of the total weight."""
+    def random(self):
+        return 0.0
+
+    def choice(self, seq):
+        return seq[-1]
+
+def test_drift_never_draws_a_removed_or_taken_key():
+    rng = random.Random(3)
+    weights = {k: rng.random() for k in range(200)}
+    sampler = WeightedSampler(list(weights), weights.__getitem__)
+    for _ in range(50000):
+        k = rng.randrange(200)
+        weights[k] = rng.choice((0.1, 0.7, 1e-9, 3.3, 1e6, 0.3))
+        sampler.update(k)
+    for k in range(150, 200):
+        sampler.remove(k)
+    for _ in range(20):
+        sampler.take(rng)
+    drawable = {sampler.keys[i] for i in range(150)} - {sampler.keys[i] for i in sampler.taken}
+    for draw in [sampler.sample(Top())] + [sampler.sample(rng) for _ in range(2000)]:
+        assert draw in drawable
+
+def test_last_drawable_key_is_stepped_down_to():
+    weights = {"a": 1.0, "b": 2.0, "c": 0.5}
+    sampler = WeightedSampler(list(weights), weights.__getitem__)
+    sampler.remove("c")
+    sampler.tree[3] += 1e-9   # the tree a little above the weights, as rounding leaves it
+    assert sampler.sample(Top()) == "b"
+
+def test_proportions():
+    weights = {"a": 1.0, "b": 3.0}
+    sampler = WeightedSampler(list(weights), weights.__getitem__)
+    rng = random.Random(0)
+    draws = [sampler.sample(rng) for _ in range(20000)]
+    assert 0.72 < draws.count("b")/len(draws) < 0.78
@@ -0,0 +1,78 @@
+import asyncio, json, time
+import pytest
+from server import QuizServer, StatsStore
+
+QUESTIONS = {
+    "1. What is 2+2?": {"correct": ["4"], "wrong": ["3", "5"]},
+    "2. Capital of France?": {"correct": ["Paris"], "wrong": ["Lyon"]},
+}
+
+@pytest.fixture
+def quiz(tmp_path):
+    return QuizServer(QUESTIONS, StatsStore(str(tmp_path / "students.json")))
+
+BAD_BODIES = [
+    b"[1, 2]",
+    b'"x"',
+    b"42",
+    b"null",
+    b'{"user": ["a"]}',
+    b'{"user": {"a": 1}}',
+    b'{"user": "a", "answer": ["4"]}',
+    b'{"user": "a", "mode": ["Practice"]}',
+]
+
+@pytest.mark.parametrize("body", BAD_BODIES)
+def test_route_rejects_bad_body(quiz, body):
+    with pytest.raises(ValueError):
+        quiz.route("POST", "/answer", body)
+
+async def request(port, body):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"POST /answer HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+@pytest.mark.parametrize("body", BAD_BODIES)
+def test_bad_body_gets_400(quiz, body):
+    async def main():
+        server = await asyncio.start_server(quiz.handle, "127.0.0.1", 0)
+        async with server:
+            return await request(server.sockets[0].getsockname()[1], body)
+    response = asyncio.run(main())
+    head, _, data = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 400 ")
+    assert "error" in json.loads(data)
+
+def test_good_answer(quiz):
+    status, payload = quiz.route("GET", "/next?user=a&mode=Arcade", b"")
+    assert status == 200
+    answer = QUESTIONS[payload["question"]]["correct"][0]
+    status, payload = quiz.route("POST", "/answer", json.dumps({"user": "a", "answer": answer}).encode())
+    assert status == 200 and payload["correct"]
+
+def test_shutdown_during_compaction_keeps_answers(tmp_path, monkeypatch):
+    path = str(tmp_path / "students.json")
+    store = StatsStore(path, compact_every=1)
+    compact = store._compact
+    def slow_compact(*args):
+        time.sleep(0.3)
+        compact(*args)
+    monkeypatch.setattr(store, "_compact", slow_compact)
+
+    async def main():
+        store.entry("a", "Q1")["stats"]["right"] = 1
+        store.mark("a", "Q1")
+        flusher = asyncio.create_task(store.flush_forever(0.01))
+        await asyncio.sleep(0.1)   # the flush is now compacting
+        store.entry("a", "Q2")["stats"]["wrong"] = 2
+        store.mark("a", "Q2")
+        flusher.cancel()            # shutting down, as serve() does
+        await store.close()
+    asyncio.run(main())
+
+    reloaded = StatsStore(path)
+    assert reloaded.entries("a")["Q1"]["stats"]["right"] == 1
+    assert reloaded.entries("a")["Q2"]["stats"]["wrong"] == 2